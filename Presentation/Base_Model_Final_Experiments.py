@@ -2,6 +2,7 @@ import logging
 import pandas as pd
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
+from numpy.random import SeedSequence
 from src.SugarScape import SugarScape
 
 def setup_logger():
@@ -35,11 +36,11 @@ def run_model(args):
         model.step()
         if step % step_size == 0:  # Output every step
             logger.info(f"Model step {step}: map_scheme={map_scheme}, replicate={replicate}")
-            gini_coefficient = model.datacollector.get_model_vars_dataframe()['Gini'].values[-1]
+            gini_coefficient = model.datacollector.latest("Gini")
             gini_over_time.append(float(gini_coefficient))
             agents_over_time.append(len(model.traders))
     
-    gini_coefficient = model.datacollector.get_model_vars_dataframe()['Gini'].values[-1]
+    gini_coefficient = model.datacollector.latest("Gini")
     logger.info(f"Finished: map_scheme={map_scheme}, replicate={replicate}, gini_coefficient={gini_coefficient}")
     
     return map_scheme, list(range(0, max_steps, step_size)), gini_over_time, agents_over_time, cell_regeneration, repopulate_factor, metabolism_mean
@@ -47,6 +48,7 @@ def run_model(args):
 # Define experiment parameters
 max_steps = 250
 replicates = 20
+root_seed = 2024
 step_size = 1
 
 # Define the different map schemes
@@ -60,12 +62,13 @@ scenarios = [
 ]
 
 def run_experiments():
-    # Generate the list of arguments for each experiment
+    # Generate the list of arguments for each experiment, every replicate gets its own child seed
+    seed_sequence = SeedSequence(root_seed)
     args_list = []
     for map_scheme in map_schemes:
         for scenario in scenarios:
             for replicate in range(replicates):
-                args = (map_scheme, replicate, None, max_steps, step_size, scenario["cell_regeneration"], scenario["repopulate_factor"], scenario["metabolism_mean"])
+                args = (map_scheme, replicate, seed_sequence.spawn(1)[0], max_steps, step_size, scenario["cell_regeneration"], scenario["repopulate_factor"], scenario["metabolism_mean"])
                 args_list.append(args)
     
     # Run the experiments in parallel
@@ -2,6 +2,7 @@ import logging
 import pandas as pd
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
+from numpy.random import SeedSequence
 from src.SugarScape import SugarScape
 
 def setup_logger():
@@ -36,11 +37,11 @@ def run_model(args):
         model.step()
         if step % step_size == 0:  # Output every step
             logger.info(f"Model step {step}: map_scheme={map_scheme}, metabolism_mean={metabolism_mean}, replicate={replicate}")
-            gini_coefficient = model.datacollector.get_model_vars_dataframe()['Gini'].values[-1]
+            gini_coefficient = model.datacollector.latest("Gini")
             gini_over_time.append(float(gini_coefficient))
             agents_over_time.append(len(model.traders))
     
-    gini_coefficient = model.datacollector.get_model_vars_dataframe()['Gini'].values[-1]
+    gini_coefficient = model.datacollector.latest("Gini")
     logger.info(f"Finished: map_scheme={map_scheme}, metabolism_mean={metabolism_mean}, replicate={replicate}, gini_coefficient={gini_coefficient}")
     
     return map_scheme, metabolism_mean, list(range(0, max_steps, step_size)), gini_over_time, agents_over_time
@@ -48,6 +49,7 @@ def run_model(args):
 # Define experiment parameters
 max_steps = 500
 replicates = 10
+root_seed = 2024
 step_size = 1
 
 # Define the different map schemes
@@ -57,12 +59,13 @@ map_schemes = ['uniform','top_heavy', 'split']
 metabolism_means = range(1, 6)
 
 def run_experiments():
-    # Generate the list of arguments for each experiment
+    # Generate the list of arguments for each experiment, every replicate gets its own child seed
+    seed_sequence = SeedSequence(root_seed)
     args_list = []
     for map_scheme in map_schemes:
         for metabolism_mean in metabolism_means:
             for replicate in range(replicates):
-                args = (map_scheme, metabolism_mean, replicate, None, max_steps, step_size)
+                args = (map_scheme, metabolism_mean, replicate, seed_sequence.spawn(1)[0], max_steps, step_size)
                 args_list.append(args)
     
     # Run the experiments in parallel
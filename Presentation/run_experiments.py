@@ -1,6 +1,7 @@
 import logging
 import pandas as pd
 from tqdm import tqdm
+from numpy.random import SeedSequence
 from src.SugarScape import SugarScape
 
 def setup_logger():
@@ -32,11 +33,11 @@ def run_model(map_scheme, tax_scheme, distributer_scheme, tax_rate, replicate, s
         model.step()
         if step % step_size == 0:  # Output every step
             logger.info(f"Model step {step}: map_scheme={map_scheme}, tax_scheme={tax_scheme}, distributer_scheme={distributer_scheme}, tax_rate={tax_rate}, replicate={replicate}")
-            gini_coefficient = model.datacollector.get_model_vars_dataframe()['Gini'].values[-1]
+            gini_coefficient = model.datacollector.latest("Gini")
             gini_over_time.append(float(gini_coefficient))
             agents_over_time.append(len(model.traders))
     
-    gini_coefficient = model.datacollector.get_model_vars_dataframe()['Gini'].values[-1]
+    gini_coefficient = model.datacollector.latest("Gini")
     logger.info(f"Finished: map_scheme={map_scheme}, tax_scheme={tax_scheme}, distributer_scheme={distributer_scheme}, tax_rate={tax_rate}, replicate={replicate}, gini_coefficient={gini_coefficient}")
     
     return map_scheme, tax_scheme, distributer_scheme, tax_rate, list(range(0, max_steps, step_size)), gini_over_time, agents_over_time
@@ -44,6 +45,7 @@ def run_model(map_scheme, tax_scheme, distributer_scheme, tax_rate, replicate, s
 # Define experiment parameters
 max_steps = 500
 replicates = 30
+root_seed = 2024
 tax_rates = [0.1, 0.25, 0.4]
 
 # Define the different map schemes
@@ -58,13 +60,14 @@ combinations = [
     ("progressive", "progressive")
 ]
 
-# Run experiments
+# Run experiments, every replicate gets its own child seed
+seed_sequence = SeedSequence(root_seed)
 for map_scheme in map_schemes:
     results_data = []
     for tax_scheme, distributer_scheme in combinations:
         for tax_rate in tax_rates:
             for replicate in range(replicates):
-                result = run_model(map_scheme, tax_scheme, distributer_scheme, tax_rate, replicate, seed_value=None)
+                result = run_model(map_scheme, tax_scheme, distributer_scheme, tax_rate, replicate, seed_value=seed_sequence.spawn(1)[0])
                 results_data.append(result)
     
     # Save results to a DataFrame and CSV file
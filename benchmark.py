@@ -0,0 +1,47 @@
+from src.Benchmarks.StepBenchmark import (build_cases, run_benchmarks, results_to_dataframe, save_baseline,
+                                          compare_to_baseline)
+from argparse import ArgumentParser
+
+
+def main():
+    # Initialize the argument parser
+    parser = ArgumentParser(description="Benchmark the SugarScape with Spice model.")
+
+    # Add all the arguments
+    parser.add_argument("--mode", type=str, default="sweep",
+                        help="Vary one setting at a time (sweep) or benchmark all combinations (product).")
+    parser.add_argument("--steps", type=int, default=50, help="The number of timed steps per case.")
+    parser.add_argument("--warmup", type=int, default=5, help="The number of steps before timing.")
+    parser.add_argument("--seed", type=int, default=0, help="The seed of the models.")
+    parser.add_argument("--engine", type=str, default="agent", help="The engine of the model.")
+    parser.add_argument("--trade_scheme", type=str, default="sequential", help="The trade scheme of the model.")
+    parser.add_argument("--max_population", type=int, default=None,
+                        help="Skip cases with a larger initial population.")
+    parser.add_argument("--processes", type=int, default=1, help="The number of cases to run at the same time.")
+    parser.add_argument("--save", type=str, default=None, help="Save the results as a JSON baseline.")
+    parser.add_argument("--compare", type=str, default=None, help="Compare the results with a JSON baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="The allowed relative slowdown or memory growth compared to the baseline.")
+
+    # Parse the arguments
+    args = parser.parse_args()
+
+    # Run the benchmarks
+    cases = build_cases(args.mode, args.engine, args.trade_scheme, args.max_population)
+    results = run_benchmarks(cases, args.steps, args.warmup, args.seed, args.processes)
+    print(results_to_dataframe(results).to_string())
+
+    # Save baseline
+    if args.save is not None:
+        save_baseline(results, args.save, args.steps, args.warmup)
+
+    # Compare with baseline
+    if args.compare is not None:
+        comparison = compare_to_baseline(results, args.compare, args.tolerance)
+        print(comparison.to_string())
+        if comparison["regression"].any():
+            raise SystemExit(f"{int(comparison['regression'].sum())} case(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
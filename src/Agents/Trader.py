@@ -1,25 +1,9 @@
 from mesa import Agent
-from numpy import random, sqrt
-from .Cell import Cell
 from mesa.model import Model
+from src.trading import bilateral_trade
 import numpy as np
 
 
-def get_distance(pos1: list[int], pos2: list[int]) -> int:
-    """
-    Compute the squared distance between two positions
-
-    Args:
-        pos1 (list[int]): Position 1 as a list of two integers [x,y]
-        pos2 (list[int]): Position 2 as a list of two integers [x,y]
-
-    Returns:
-        int: Squared distance between the two positions
-
-    """
-    return (pos1[0] - pos2[0]) ** 2 + (pos1[1] - pos2[1]) ** 2
-
-
 class Trader(Agent):
     """
     A trader agent that moves around the grid, picks up sugar and spice, trades with other traders, and metabolizes sugar and spice.
@@ -44,8 +28,8 @@ class Trader(Agent):
         pick_up(): Pick up sugar and spice from the cell
         metabolize(): Metabolize sugar and spice
         trade(): Trade sugar and spice with other traders
+        trade_with(other): Trade sugar and spice with a single other trader
         mrs(): Compute the Marginal Rate of Substitution (MRS)
-        improve_welfare(high, low, trade_sugar, trade_spice): Check if welfare is improved after trade
         repopulate(): Repopulate the grid with new traders
         age_increase(): Increment the age of the trader
         welfare(sugar, spice): Compute the welfare of the trader
@@ -99,30 +83,39 @@ class Trader(Agent):
         Returns:
             None
         """
+        profiler = self.model.profiler
+
         # Move agent
-        self.move()
+        with profiler.phase("move"):
+            self.move()
 
         # Pick up sugar and spice
-        self.pick_up()
+        with profiler.phase("pick_up"):
+            self.pick_up()
 
         # Update wealth
-        self.update_wealth()
+        with profiler.phase("update_wealth"):
+            self.update_wealth()
 
         # Trade sugar and spice
-        self.trade()
+        with profiler.phase("trade"):
+            self.trade()
 
         # Repopulation
-        self.repopulate()
+        with profiler.phase("repopulate"):
+            self.repopulate()
 
         # Metabolize sugar and spice
-        self.metabolize()
+        with profiler.phase("metabolize"):
+            self.metabolize()
 
         # Increment age
-        self.age_increase()
+        with profiler.phase("age"):
+            self.age_increase()
 
         # Check if agent has died
         if self.has_died:
-            self.model.remove_agent(self)
+            self.model.queue_death(self)
 
     def move(self) -> None:
         """
@@ -131,45 +124,25 @@ class Trader(Agent):
         Returns:
             None
         """
-        # Get neighborhood
-        neighbours = [i for i in self.model.grid.get_neighborhood(
-            self.pos, moore=False, include_center=False, radius=self.vision
-        )]
-
-        # Get cell with most sugar
-        max_welfare = -1
-        best_position = None
-        shortest_distance = float('inf')
-
-        for neighbour in neighbours:
-            # Check if another trader is in the cell
-            this_cell = self.model.grid.get_cell_list_contents([neighbour])
-
-            # Check if trader within cell
-            has_agent = False
-            for cells in this_cell:
-                if isinstance(cells, Trader):
-                    has_agent = True
-                    break
-            if has_agent:
-                continue
-            agent = this_cell[0]
+        # Get visible cells
+        x, y, distances = self.model.grid.visible_cells(self.pos, self.vision)
+        self.model.profiler.count("cells_examined", len(x))
+
+        # Only keep cells without another trader
+        free = self.model.grid.occupancy[x, y] == 0
+        if not free.any():
+            return
+        x, y, distances = x[free], y[free], distances[free]
 
-            # Compute welfare based on sum of current resources and resources in the cell
-            combined_sugar = self.sugar + agent.sugar
-            combined_spice = self.spice + agent.spice
-            welfare = self.welfare(combined_sugar, combined_spice)
-            distance = get_distance(self.pos, neighbour)
+        # Compute welfare based on sum of current resources and resources in the cell
+        field = self.model.resource_field
+        welfare = self.welfare(self.sugar + field.sugar[x, y], self.spice + field.spice[x, y])
 
-            # Update best position
-            if (welfare > max_welfare) or (welfare == max_welfare and distance < shortest_distance):
-                max_welfare = welfare
-                best_position = neighbour
-                shortest_distance = distance
+        # Cell with the highest welfare, ties are broken by the shortest distance
+        best = np.argmin(np.where(welfare == welfare.max(), distances, np.iinfo(distances.dtype).max))
 
-        if best_position:
-            # Move to the position with the highest welfare
-            self.model.grid.move_agent(self, best_position)
+        # Move to the position with the highest welfare
+        self.model.grid.move_agent(self, (int(x[best]), int(y[best])))
 
     def pick_up(self) -> None:
         """
@@ -178,15 +151,10 @@ class Trader(Agent):
         Returns:
             None
         """
-        this_cell = self.model.grid.get_cell_list_contents([self.pos])
         # Grab all sugar and spice from cell
-        for agent in this_cell:
-            if isinstance(agent, Cell):
-                self.sugar += agent.sugar
-                agent.sugar = 0
-
-                self.spice += agent.spice
-                agent.spice = 0
+        sugar, spice = self.model.resource_field.harvest(*self.pos)
+        self.sugar += sugar
+        self.spice += spice
 
     def metabolize(self) -> None:
         """
@@ -215,127 +183,80 @@ class Trader(Agent):
         """
         # Get neighborhood
         neighbors = self.model.grid.get_neighbors(self.pos, moore=False, include_center=False, radius=1)
-        random.shuffle(neighbors)
+        self.model.profiler.count("neighbours_examined", len(neighbors))
+        self.model.rng.shuffle(neighbors)
 
         # Loop through neighbors
-        for neighbors in neighbors:
-            # Skip if not a trader
-            if not isinstance(neighbors, Trader):
+        for neighbor in neighbors:
+            # Skip if not a trader, or if the trader died this step
+            if not isinstance(neighbor, Trader) or neighbor.has_died:
                 continue
 
-            # Allows for continuous trading
-            while True:
-                # Compute MRS
-                mrs = self.mrs()
-                neighbors_mrs = neighbors.mrs()
-
-                # No more trading if MRS are equal
-                if mrs == neighbors_mrs:
-                    break
-
-                # Check who has the higher MRS
-                if mrs > neighbors_mrs:
-                    high = self
-                    low = neighbors
-                else:
-                    high = neighbors
-                    low = self
-
-                # Compute the trade price
-                trade_price = sqrt(mrs * neighbors_mrs)
-
-                if trade_price == 0:
-                    break
-
-                # Check if trade price is greater than 1
-                if trade_price > 1:
-                    trade_spice = trade_price
-                    trade_sugar = 1
-                else:
-                    trade_spice = 1
-                    trade_sugar = 1 / trade_price
-
-                # Update based on MRS
-                trade_sugar = min(trade_sugar, low.sugar)
-                trade_spice = min(trade_spice, high.spice)
-
-                # No more sugar/spice to trade
-                if trade_sugar <= 0 or trade_spice <= 0:
-                    break
-
-                # Check if trade improves welfare
-                if self.improve_welfare(high, low, trade_sugar, trade_spice):
-                    # Trade sugar and spice
-                    high.sugar += trade_sugar
-                    high.spice -= trade_spice
-                    low.sugar -= trade_sugar
-                    low.spice += trade_spice
-
-                    # Update table
-                    self.model.datacollector.add_table_row("Trades", {
-                        'Step': self.model.current_step,
-                        'TraderHighMRS_ID': high.unique_id,
-                        'TraderLowMRS_ID': low.unique_id,
-                        'TradeSugar': trade_sugar,
-                        'TradeSpice': trade_spice,
-                        'TradePrice': trade_price
-                    })
-
-                # No more improvements
-                else:
-                    break
+            self.trade_with(neighbor)
 
-    def mrs(self) -> float:
+    def trade_with(self, other: "Trader") -> None:
         """
-        Compute the Marginal Rate of Substitution (MRS)
+        Trade sugar and spice with a single other trader until no trade improves the welfare of both traders. The
+        trades are logged as one row per pair, or one row per unit exchanged if the model logs trade units.
+
+        Args:
+            other (Trader): Trader to trade with
 
         Returns:
-            float: Marginal Rate of Substitution (MRS)
+            None
         """
-        return (self.sugar_metabolism * self.spice) / (self.spice_metabolism * self.sugar + 1e-9)
+        self_sugar, self_spice, other_sugar, other_spice, records, stats = bilateral_trade(
+            self.sugar, self.spice, self.sugar_metabolism, self.spice_metabolism, self.wealth,
+            other.sugar, other.spice, other.sugar_metabolism, other.spice_metabolism, other.wealth,
+            self.sugar_weight, self.spice_weight, per_unit=self.model.trade_rows == "unit"
+        )
+
+        # Every trade runs one iteration per unit exchanged and one that ends the trade
+        profiler = self.model.profiler
+        if profiler.enabled:
+            profiler.count("trade_pairs")
+            profiler.count("trade_iterations", 1 + sum(record[4] for record in records))
+            profiler.count("trade_rows", len(records))
+
+        # No trade took place
+        if not records:
+            return
+
+        # Update price statistics
+        self.model.record_trade_stats(stats)
+
+        # Update goods
+        self.sugar, self.spice = self_sugar, self_spice
+        other.sugar, other.spice = other_sugar, other_spice
+
+        # Update trade log
+        trade_log = self.model.trade_log
+        if not trade_log.enabled:
+            return
+        for self_is_high, trade_sugar, trade_spice, trade_price, units in records:
+            high, low = (self, other) if self_is_high else (other, self)
+            trade_log.append(self.model.current_step, high.unique_id, low.unique_id, trade_sugar, trade_spice,
+                             trade_price, units)
 
-    def improve_welfare(self, high: "Trader", low: "Trader", trade_sugar: float, trade_spice: float) -> bool:
+    def mrs(self) -> float:
         """
-        Check if welfare is improved after trade and if MRS is not crossed
-
-        Args:
-            high (Trader): Trader with higher MRS
-            low (Trader): Trader with lower MRS
-            trade_sugar (float): Amount of sugar to trade
-            trade_spice (float): Amount of spice to trade
+        Compute the Marginal Rate of Substitution (MRS)
 
         Returns:
-            bool: If welfare is improved after trade and MRS is not crossed
+            float: Marginal Rate of Substitution (MRS)
         """
-        # Compute welfare
-        high_sugar = high.sugar + trade_sugar
-        high_spice = high.spice - trade_spice
-        low_sugar = low.sugar - trade_sugar
-        low_spice = low.spice + trade_spice
-
-        # Compute welfare
-        high_welfare = self.welfare(high_sugar, high_spice)
-        low_welfare = self.welfare(low_sugar, low_spice)
-
-        # Check if welfare is improved
-        improved = high_welfare > high.wealth and low_welfare > low.wealth
-
-        # Make sure that MRS is not crossed
-        not_crossed = high_welfare > low_welfare
-
-        # Check if welfare is improved
-        return improved and not_crossed
+        return (self.sugar_metabolism * self.spice) / (self.spice_metabolism * self.sugar + 1e-9)
 
     def repopulate(self) -> None:
         """
-        Repopulate the grid with new traders.
+        Queue a new trader if the trader has enough resources, the new trader is added at the end of the step.
 
         Returns:
             None
         """
         if (self.sugar >= self.model.repopulate_factor * self.sugar_metabolism
                 and self.spice >= self.model.repopulate_factor * self.spice_metabolism):
-            self.model.repopulation()
+            self.model.queue_birth()
             repopulate_loss_ratio = 0.5
                 # Reduce sugar and spice
             self.sugar *= 1 - repopulate_loss_ratio
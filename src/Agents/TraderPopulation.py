@@ -0,0 +1,295 @@
+import numpy as np
+from mesa.model import Model
+from .Trader import Trader
+
+
+class TraderPopulation:
+    """
+    Columnar storage of all traders in the model. Every trader attribute is stored in a NumPy column, and each trader
+    owns one slot (row) in these columns. Slots of dead traders are put on a free-list and reused for new traders.
+
+    Attributes:
+        capacity (int): Number of slots allocated in every column
+        size (int): Number of slots that have been used so far
+        free (list[int]): Slots of dead traders that can be reused
+        alive (numpy.ndarray): Whether a slot is occupied by a living trader
+        unique_id (numpy.ndarray): Unique identifier of the trader in each slot
+        sugar (numpy.ndarray): Sugar resource of each trader
+        spice (numpy.ndarray): Spice resource of each trader
+        sugar_metabolism (numpy.ndarray): Sugar metabolism rate of each trader
+        spice_metabolism (numpy.ndarray): Spice metabolism rate of each trader
+        vision (numpy.ndarray): Vision range of each trader
+        age (numpy.ndarray): Current age of each trader
+        max_age (numpy.ndarray): Maximum age of each trader
+        x (numpy.ndarray): x coordinate of each trader, -1 if the trader is not on the grid
+        y (numpy.ndarray): y coordinate of each trader, -1 if the trader is not on the grid
+        wealth (numpy.ndarray): Wealth of each trader
+
+    Methods:
+        add(unique_id)
+            Reserve a slot for a new trader.
+        remove(slot)
+            Free the slot of a dead trader.
+        active()
+            Get the slots of all living traders.
+        column(name)
+            Get the values of a column for all living traders.
+        update_wealth()
+            Update the wealth of all living traders.
+        repopulate(repopulate_factor)
+            Halve the resources of all traders that reproduce.
+        metabolize()
+            Metabolize sugar and spice of all living traders.
+        age_increase()
+            Increment the age of all living traders.
+    """
+    # Data type of every column
+    COLUMNS = {
+        "unique_id": np.int64,
+        "sugar": np.float64,
+        "spice": np.float64,
+        "sugar_metabolism": np.int64,
+        "spice_metabolism": np.int64,
+        "vision": np.int64,
+        "age": np.int64,
+        "max_age": np.int64,
+        "x": np.int64,
+        "y": np.int64,
+        "wealth": np.float64,
+    }
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Constructor for TraderPopulation
+
+        Args:
+            capacity (int): Number of slots to allocate at the start, the columns grow when more are needed
+        """
+        self.capacity = max(1, capacity)
+        self.size = 0
+        self.free = []
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        for name, dtype in self.COLUMNS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+
+    def __len__(self) -> int:
+        """
+        Number of living traders.
+
+        Returns:
+            int: Number of living traders
+        """
+        return self.size - len(self.free)
+
+    def _grow(self) -> None:
+        """
+        Double the capacity of all columns.
+
+        Returns:
+            None
+        """
+        self.capacity *= 2
+        for name in ["alive", *self.COLUMNS]:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, unique_id: int) -> int:
+        """
+        Reserve a slot for a new trader. Slots of dead traders are reused first.
+
+        Args:
+            unique_id (int): Unique identifier of the new trader
+
+        Returns:
+            int: Slot of the new trader
+        """
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            slot = self.size
+            self.size += 1
+
+        # Reset slot
+        for name in self.COLUMNS:
+            getattr(self, name)[slot] = 0
+        self.x[slot] = self.y[slot] = -1
+        self.unique_id[slot] = unique_id
+        self.alive[slot] = True
+
+        return slot
+
+    def remove(self, slot: int) -> None:
+        """
+        Free the slot of a dead trader.
+
+        Args:
+            slot (int): Slot of the trader
+
+        Returns:
+            None
+        """
+        self.alive[slot] = False
+        self.free.append(slot)
+
+    def active(self) -> np.ndarray:
+        """
+        Get the slots of all living traders.
+
+        Returns:
+            numpy.ndarray: Slots of all living traders
+        """
+        return np.flatnonzero(self.alive[:self.size])
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get the values of a column for all living traders.
+
+        Args:
+            name (str): Name of the column
+
+        Returns:
+            numpy.ndarray: Values of the column for all living traders
+        """
+        return getattr(self, name)[:self.size][self.alive[:self.size]]
+
+    def update_wealth(self) -> None:
+        """
+        Update the wealth of all living traders based on sugar and spice metabolism rates.
+
+        Returns:
+            None
+        """
+        n = self.size
+        alive = self.alive[:n]
+        spice_wealth = np.zeros(n)
+        np.divide(self.sugar[:n], self.sugar_metabolism[:n], out=self.wealth[:n], where=alive)
+        np.divide(self.spice[:n], self.spice_metabolism[:n], out=spice_wealth, where=alive)
+        np.add(self.wealth[:n], spice_wealth, out=self.wealth[:n], where=alive)
+
+    def repopulate(self, repopulate_factor: float) -> int:
+        """
+        Find all living traders that have enough resources to reproduce, and halve their sugar and spice.
+
+        Args:
+            repopulate_factor (float): The factor used to determine when to repopulate traders
+
+        Returns:
+            int: Number of traders that reproduce
+        """
+        n = self.size
+        parents = (self.alive[:n]
+                   & (self.sugar[:n] >= repopulate_factor * self.sugar_metabolism[:n])
+                   & (self.spice[:n] >= repopulate_factor * self.spice_metabolism[:n]))
+
+        # Reduce sugar and spice
+        repopulate_loss_ratio = 0.5
+        self.sugar[:n][parents] *= 1 - repopulate_loss_ratio
+        self.spice[:n][parents] *= 1 - repopulate_loss_ratio
+
+        return int(np.count_nonzero(parents))
+
+    def metabolize(self) -> np.ndarray:
+        """
+        Metabolize sugar and spice of all living traders.
+
+        Returns:
+            numpy.ndarray: Mask over the used slots of the traders that starved
+        """
+        n = self.size
+        alive = self.alive[:n]
+        np.subtract(self.sugar[:n], self.sugar_metabolism[:n], out=self.sugar[:n], where=alive)
+        np.subtract(self.spice[:n], self.spice_metabolism[:n], out=self.spice[:n], where=alive)
+
+        return alive & ((self.sugar[:n] < 0) | (self.spice[:n] < 0))
+
+    def age_increase(self) -> np.ndarray:
+        """
+        Increment the age of all living traders.
+
+        Returns:
+            numpy.ndarray: Mask over the used slots of the traders that reached their maximum age
+        """
+        n = self.size
+        alive = self.alive[:n]
+        np.add(self.age[:n], 1, out=self.age[:n], where=alive)
+
+        return alive & (self.age[:n] >= self.max_age[:n])
+
+
+class _Column:
+    """
+    Descriptor that maps a trader attribute onto its slot in the TraderPopulation columns.
+    """
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, trader: "PopulationTrader", owner: type = None):
+        if trader is None:
+            return self
+        return getattr(trader.population, self.name)[trader.slot]
+
+    def __set__(self, trader: "PopulationTrader", value) -> None:
+        getattr(trader.population, self.name)[trader.slot] = value
+
+
+class _Position:
+    """
+    Descriptor that maps the position of a trader onto the x and y columns of the TraderPopulation.
+    """
+    def __get__(self, trader: "PopulationTrader", owner: type = None):
+        if trader is None:
+            return self
+        x = trader.population.x[trader.slot]
+        if x < 0:
+            return None
+        return int(x), int(trader.population.y[trader.slot])
+
+    def __set__(self, trader: "PopulationTrader", pos: tuple[int, int]) -> None:
+        if pos is None:
+            pos = (-1, -1)
+        trader.population.x[trader.slot], trader.population.y[trader.slot] = pos
+
+
+class PopulationTrader(Trader):
+    """
+    Trader whose state is stored in the columns of a TraderPopulation instead of in instance attributes. It behaves
+    exactly like a Trader, but allows the model to update all traders at once with array operations.
+
+    Attributes:
+        population (TraderPopulation): Population that stores the state of the trader
+        slot (int): Slot of the trader in the population
+    """
+    sugar = _Column()
+    spice = _Column()
+    sugar_metabolism = _Column()
+    spice_metabolism = _Column()
+    vision = _Column()
+    age = _Column()
+    max_age = _Column()
+    wealth = _Column()
+    pos = _Position()
+
+    def __init__(self, unique_id: int, model: Model, sugar: int, sugar_metabolism: int,
+                 spice: int, spice_metabolism: int, vision: int, max_age: int):
+        """
+        Initialize a trader agent stored in the population of the model
+
+        Args:
+            unique_id (int): Unique identifier of the agent
+            model (SugarScape): Model where the agent belongs
+            sugar (int): Sugar resource of the trader at the start
+            sugar_metabolism (int): Metabolism rate of sugar
+            spice (int): Spice resource of the trader at the start
+            spice_metabolism (int): Metabolism rate of spice
+            vision (int): Vision range of the trader, also affects the movement
+            max_age (int): Maximum age of the trader
+        """
+        # Reserve slot before any attribute is set
+        self.population = model.population
+        self.slot = self.population.add(unique_id)
+
+        super().__init__(unique_id, model, sugar, sugar_metabolism, spice, spice_metabolism, vision, max_age)
@@ -0,0 +1,302 @@
+import json
+import platform
+import sys
+from itertools import product
+from math import ceil, sqrt
+from multiprocessing import get_context
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from src.SugarScape import SugarScape
+
+# Settings of the baseline case, every sweep varies one of them
+BASE_CASE = {
+    "size": 50,
+    "initial_population": 300,
+    "vision_mean": 3,
+    "tax_scheme": "progressive",
+    "distributer_scheme": "progressive",
+    "track_scheme": "analysis",
+}
+
+# Values of every dimension of the benchmark matrix
+MATRIX = {
+    "size": [50, 100, 250, 500],
+    "initial_population": [300, 1000, 5000, 20000, 50000],
+    "vision_mean": [1, 2, 3, 4, 5, 6],
+    "taxes": list(product(["flat", "progressive", "regressive", "luxury"],
+                          ["flat", "progressive", "needs", "random"])),
+    "track_scheme": ["analysis", "server", "segregation"],
+}
+
+# Minimum number of cells per trader for the population cases
+CELLS_PER_TRADER = 8
+
+
+def case_name(case: dict) -> str:
+    """
+    Get a unique name of a benchmark case, used to match cases with the baseline.
+
+    Args:
+        case (dict): The settings of the case
+
+    Returns:
+        str: The name of the case
+    """
+    return (f"{case['size']}x{case['size']}-pop{case['initial_population']}-vision{case['vision_mean']}-"
+            f"{case['tax_scheme']}-{case['distributer_scheme']}-{case['track_scheme']}-{case['engine']}-"
+            f"{case['trade_scheme']}")
+
+
+def build_cases(mode: str = "sweep", engine: str = "agent", trade_scheme: str = "sequential",
+                max_population: int = None) -> list[dict]:
+    """
+    Build the benchmark cases from the matrix. In "sweep" mode every dimension is varied on its own while the other
+    settings are kept at the base case, in "product" mode all combinations are benchmarked. Population cases use a
+    grid that is large enough to give every trader at least CELLS_PER_TRADER cells.
+
+    Args:
+        mode (str): Either "sweep" or "product"
+        engine (str): The engine of the model
+        trade_scheme (str): The trade scheme of the model
+        max_population (int): Skip cases with a larger initial population
+
+    Returns:
+        list[dict]: The settings of every case
+    """
+    if mode == "sweep":
+        combinations = [dict(BASE_CASE)]
+        for dimension, values in MATRIX.items():
+            for value in values:
+                case = dict(BASE_CASE)
+                if dimension == "taxes":
+                    case["tax_scheme"], case["distributer_scheme"] = value
+                else:
+                    case[dimension] = value
+                if dimension == "initial_population":
+                    case["size"] = max(case["size"], ceil(sqrt(CELLS_PER_TRADER * value)))
+                combinations.append(case)
+    elif mode == "product":
+        combinations = []
+        for size, population, vision, (tax, distributer), track in product(*MATRIX.values()):
+            combinations.append({"size": size, "initial_population": population, "vision_mean": vision,
+                                 "tax_scheme": tax, "distributer_scheme": distributer, "track_scheme": track})
+    else:
+        raise ValueError("Invalid benchmark mode")
+
+    # Remove duplicates and too large cases
+    cases = {}
+    for case in combinations:
+        if max_population is not None and case["initial_population"] > max_population:
+            continue
+        case.update(engine=engine, trade_scheme=trade_scheme)
+        cases[case_name(case)] = case
+
+    return list(cases.values())
+
+
+def peak_rss() -> int:
+    """
+    Get the peak resident set size of the current process in bytes.
+
+    Returns:
+        int: The peak resident set size in bytes
+    """
+    try:
+        import resource
+    except ImportError:
+        # Windows has no resource module
+        import psutil
+        memory = psutil.Process().memory_info()
+        return getattr(memory, "peak_wset", memory.rss)
+
+    # Linux reports kilobytes, macOS reports bytes
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(case: dict, steps: int = 50, warmup: int = 5, seed: int = 0) -> dict:
+    """
+    Benchmark a single case. The model is created, stepped warmup times with SugarScape.step, and then run for the
+    given number of steps with SugarScape.run_model while the StepProfiler records every phase. Should be run in a
+    fresh process so the peak memory belongs to this case only.
+
+    Args:
+        case (dict): The settings of the case
+        steps (int): The number of timed steps
+        warmup (int): The number of steps before timing
+        seed (int): The seed of the model
+
+    Returns:
+        dict: The case with its timings, peak memory and per-phase breakdown
+    """
+    # Create model
+    start = perf_counter()
+    model = SugarScape(height=case["size"], width=case["size"], initial_population=case["initial_population"],
+                       vision_mean=case["vision_mean"], tax_scheme=case["tax_scheme"], tax_rate=0.1,
+                       distributer_scheme=case["distributer_scheme"], track_scheme=case["track_scheme"],
+                       engine=case["engine"], trade_scheme=case["trade_scheme"], seed_value=seed, profile=True)
+    setup_time = perf_counter() - start
+
+    # Warm up with single steps
+    step_times = []
+    for i in range(warmup):
+        start = perf_counter()
+        model.step()
+        step_times.append(perf_counter() - start)
+
+    # Timed run, only the timed steps are profiled
+    model.profiler.records = []
+    start = perf_counter()
+    model.run_model(steps)
+    run_time = perf_counter() - start
+
+    # Time per step of every phase
+    summary = model.profiler.summary()
+    phases = {name: {"time_per_step": phase["time"] / steps, "calls_per_step": phase["calls"] / steps,
+                     "share": phase["share"]}
+              for name, phase in summary["phases"].items()}
+    counters = {name: total / steps for name, total in summary["counters"].items()}
+
+    return {
+        "name": case_name(case),
+        "case": case,
+        "steps": steps,
+        "setup_time": setup_time,
+        "warmup_step_time": float(np.median(step_times)) if step_times else None,
+        "run_time": run_time,
+        "steps_per_sec": steps / run_time if run_time > 0 else float("inf"),
+        "final_traders": len(model.traders),
+        "peak_rss_mb": peak_rss() / 2 ** 20,
+        "phases": phases,
+        "counters": counters,
+    }
+
+
+def _run_case(args: tuple) -> dict:
+    """
+    Unpack the arguments of a case for the process pool.
+
+    Args:
+        args (tuple): The case, steps, warmup and seed
+
+    Returns:
+        dict: The result of the case
+    """
+    return run_case(*args)
+
+
+def run_benchmarks(cases: list[dict], steps: int = 50, warmup: int = 5, seed: int = 0,
+                   processes: int = 1) -> list[dict]:
+    """
+    Benchmark all cases, every case in its own fresh process so peak memory is measured per case. Cases run one at
+    a time by default, so they do not compete for the CPU.
+
+    Args:
+        cases (list[dict]): The settings of every case
+        steps (int): The number of timed steps
+        warmup (int): The number of steps before timing
+        seed (int): The seed of the models
+        processes (int): The number of cases to run at the same time
+
+    Returns:
+        list[dict]: The result of every case
+    """
+    args = [(case, steps, warmup, seed) for case in cases]
+    with get_context("spawn").Pool(processes, maxtasksperchild=1) as pool:
+        results = list(tqdm(pool.imap(_run_case, args), total=len(args), ncols=100))
+
+    return results
+
+
+def results_to_dataframe(results: list[dict]) -> pd.DataFrame:
+    """
+    Convert benchmark results to a DataFrame with one row per case and the time per step of every phase.
+
+    Args:
+        results (list[dict]): The result of every case
+
+    Returns:
+        pd.DataFrame: The results indexed by case name
+    """
+    rows = []
+    for result in results:
+        row = {"name": result["name"], **result["case"], "steps_per_sec": result["steps_per_sec"],
+               "setup_time": result["setup_time"], "peak_rss_mb": result["peak_rss_mb"]}
+        for name, phase in result["phases"].items():
+            row[f"{name}_time"] = phase["time_per_step"]
+        rows.append(row)
+
+    return pd.DataFrame(rows).set_index("name")
+
+
+def save_baseline(results: list[dict], path: str, steps: int, warmup: int) -> None:
+    """
+    Save benchmark results as a JSON baseline, together with the environment they were measured in.
+
+    Args:
+        results (list[dict]): The result of every case
+        path (str): The file to write the baseline to
+        steps (int): The number of timed steps
+        warmup (int): The number of steps before timing
+
+    Returns:
+        None
+    """
+    baseline = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+        },
+        "steps": steps,
+        "warmup": warmup,
+        "results": results,
+    }
+    with open(path, "w") as file:
+        json.dump(baseline, file, indent=2)
+
+
+def compare_to_baseline(results: list[dict], path: str, tolerance: float = 0.1) -> pd.DataFrame:
+    """
+    Compare benchmark results with a saved baseline. A case regresses if its steps per second dropped, or its peak
+    memory grew, by more than the tolerance. Cases that are not in the baseline are skipped.
+
+    Args:
+        results (list[dict]): The result of every case
+        path (str): The baseline file
+        tolerance (float): The allowed relative change
+
+    Returns:
+        pd.DataFrame: The baseline and current steps per second and peak memory, their ratios and whether the case
+        regressed, indexed by case name
+    """
+    with open(path) as file:
+        baseline = {result["name"]: result for result in json.load(file)["results"]}
+
+    rows = []
+    for result in results:
+        if result["name"] not in baseline:
+            continue
+        old = baseline[result["name"]]
+        speed = result["steps_per_sec"] / old["steps_per_sec"]
+        memory = result["peak_rss_mb"] / old["peak_rss_mb"]
+        rows.append({
+            "name": result["name"],
+            "baseline_steps_per_sec": old["steps_per_sec"],
+            "steps_per_sec": result["steps_per_sec"],
+            "speed_ratio": speed,
+            "baseline_peak_rss_mb": old["peak_rss_mb"],
+            "peak_rss_mb": result["peak_rss_mb"],
+            "memory_ratio": memory,
+            "regression": speed < 1 - tolerance or memory > 1 + tolerance,
+        })
+
+    return pd.DataFrame(rows, columns=["name", "baseline_steps_per_sec", "steps_per_sec", "speed_ratio",
+                                       "baseline_peak_rss_mb", "peak_rss_mb", "memory_ratio",
+                                       "regression"]).set_index("name")
@@ -1,20 +1,21 @@
-from src.Agents.Trader import Trader
+from src.RankingCache import RankingCache
 from src.Taxers.BaseTaxer import BaseTaxer
 
 
 class BaseDistributer:
     """
     Base class for distributers. All other distributers should inherit from this class. Every class that inherits from
-    this class should implement the distribute method with two arguments: agents and taxer.
+    this class should implement the distribute method with the arguments agents, taxer and ranking, an optional
+    RankingCache with the holdings and rankings of the agents shared with the taxer.
 
     Attributes:
         distributer_steps (int): Number of steps between each distribution
         current_step (int): Current step number
 
     Methods:
-        step(agents, taxer):
+        step(agents, taxer, ranking=None):
             Distributes the taxes to the agents every distributer_steps steps
-        distribute(agents, taxer):
+        distribute(agents, taxer, ranking=None):
             Distributes the taxes to the agents
     """
     def __init__(self, distributer_steps: int):
@@ -27,13 +28,14 @@ class BaseDistributer:
         self.distributer_steps = distributer_steps
         self.current_step = 0
 
-    def step(self, agents: dict, taxer: BaseTaxer) -> None:
+    def step(self, agents: dict, taxer: BaseTaxer, ranking: RankingCache = None) -> None:
         """
         Take step in the distributer. Distributes the taxes to the agents every distributer_steps steps.
 
         Args:
             agents (dict): Dictionary of agents
             taxer (BaseTaxer): Taxer object
+            ranking (RankingCache): Holdings and rankings of the agents shared with the taxer
 
         Returns:
             None
@@ -41,26 +43,27 @@ class BaseDistributer:
         """
         self.current_step += 1
         if self.current_step % self.distributer_steps == 0:
-            self.distribute(agents, taxer)
+            self.distribute(agents, taxer, ranking)
 
-    def distribute(self, agents: dict, taxer: BaseTaxer) -> None:
+    def distribute(self, agents: dict, taxer: BaseTaxer, ranking: RankingCache = None) -> None:
         """
-        Distributes the taxes to the agents
+        Distributes the taxes equally to the agents
 
         Args:
             agents (dict): Dictionary of agents
             taxer (BaseTaxer): Taxer object
+            ranking (RankingCache): Holdings and rankings of the agents shared with the taxer
 
         Returns:
             None
         """
-        total_agents = len([agent for agent in agents if isinstance(agent, Trader)])
+        holdings = (ranking if ranking is not None else RankingCache(agents)).holdings
+        total_agents = len(holdings)
         if total_agents > 0:
             sugar_per_agent = taxer.taxes_collection["sugar"] / total_agents
             spice_per_agent = taxer.taxes_collection["spice"] / total_agents
-            for agent in agents:
-                agent.sugar += sugar_per_agent
-                agent.spice += spice_per_agent
+            holdings.write("sugar", holdings["sugar"] + sugar_per_agent)
+            holdings.write("spice", holdings["spice"] + spice_per_agent)
 
             # Reset taxes collection
             taxer.reset_tax()
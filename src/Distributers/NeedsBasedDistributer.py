@@ -1,54 +1,59 @@
+import numpy as np
+
 from .BaseDistributer import BaseDistributer
+from src.RankingCache import RankingCache
 from src.Taxers.BaseTaxer import BaseTaxer
 
 
 class NeedsBasedDistributer(BaseDistributer):
     """
-    Distributes resources based on the needs of the agents. This distributer loops through all agents sorted by their
-    needs from highest to lowest the trader receives resources till their metabolism is satisfied.
+    Distributes resources based on the needs of the agents. Agents are served from the highest need to the lowest,
+    and every agent receives resources until their metabolism is satisfied or the collected taxes run out (water
+    filling). The grants of all agents are computed at once: the cumulative needs in serving order show which agents
+    are fully served, and the first agent that is not gets the rest. Taxes that are left because every need was
+    satisfied stay in the taxes collection for the next distribution.
     """
-    def distribute(self, agents: dict, taxer: BaseTaxer):
+    def distribute(self, agents: dict, taxer: BaseTaxer, ranking: RankingCache = None):
         """
-        Distributes resources based on the needs of the agents.
+        Distributes resources based on the needs of the agents, in the order of the need rankings of the ranking
+        cache.
 
         Args:
             agents (dict): Dictionary of agents
             taxer (BaseTaxer): Taxer object
+            ranking (RankingCache): Holdings and rankings of the agents shared with the taxer
 
         Returns:
             None
         """
-        # Calculate needs based on the difference between current resources and metabolism
-        sugar_needs = []
-        spice_needs = []
-        for agent in agents:
-            sugar_need = max(0, agent.sugar_metabolism - agent.sugar)
-            spice_need = max(0, agent.spice_metabolism - agent.spice)
-            sugar_needs.append((agent, sugar_need))
-            spice_needs.append((agent, spice_need))
-
-        # Sort needs based on sugar and spice
-        sugar_needs.sort(key=lambda x: x[1], reverse=True)
-        spice_needs.sort(key=lambda x: x[1], reverse=True)
-
-        # Get total sugar and spice collected
-        total_sugar = taxer.taxes_collection["sugar"]
-        total_spice = taxer.taxes_collection["spice"]
-
-        # Distribute sugar
-        for (agent, sugar_need) in sugar_needs:
-            if total_sugar <= 0:
-                break
-
-            distributed_sugar = min(sugar_need, total_sugar)
-            agent.sugar += distributed_sugar
-            total_sugar -= distributed_sugar
-
-        # Distribute spice
-        for (agent, spice_need) in spice_needs:
-            if total_spice <= 0:
-                break
-
-            distributed_spice = min(spice_need, total_spice)
-            agent.spice += distributed_spice
-            total_spice -= distributed_spice
+        ranking = ranking if ranking is not None else RankingCache(agents)
+        holdings = ranking.holdings
+        if len(holdings) == 0:
+            return
+
+        for resource in ("sugar", "spice"):
+            # Get total collected
+            total = taxer.taxes_collection[resource]
+            if total <= 0:
+                continue
+
+            # Needs based on the difference between current resources and metabolism, from highest to lowest
+            order = ranking.order(f"{resource}_need", descending=True)
+            needs = ranking.key(f"{resource}_need")[order]
+
+            # Agents before the cutoff are fully served, the agent at the cutoff gets what is left
+            cumulative_needs = np.cumsum(needs)
+            cutoff = int(np.searchsorted(cumulative_needs, total, side="right"))
+            grants = np.zeros(len(needs))
+            grants[:cutoff] = needs[:cutoff]
+            served = cumulative_needs[cutoff - 1] if cutoff > 0 else 0
+            if cutoff < len(needs):
+                grants[cutoff] = total - served
+
+            # Add all grants at once
+            received = np.zeros(len(needs))
+            received[order] = grants
+            holdings.write(resource, holdings[resource] + received, mask=received > 0)
+
+            # Keep the taxes that were not needed for the next distribution, nothing is left if the cutoff was reached
+            taxer.taxes_collection[resource] = 0 if cutoff < len(needs) else total - float(served)
@@ -1,4 +1,7 @@
+import numpy as np
+
 from .BaseDistributer import BaseDistributer
+from src.RankingCache import RankingCache
 from src.Taxers.BaseTaxer import BaseTaxer
 
 
@@ -13,68 +16,44 @@ class ProgressiveDistributer(BaseDistributer):
     Low class agents receive 4/3 of the total tax collection, middle class agents receive 1/3 of the total tax
     collection, and high class agents receive 2/3 of the total tax collection.
     """
-    def distribute(self, agents: dict, taxer: BaseTaxer) -> None:
+    def distribute(self, agents: dict, taxer: BaseTaxer, ranking: RankingCache = None) -> None:
         """
-        Distribute according to progressive scheme.
+        Distribute according to progressive scheme. The class thresholds are read from the sugar and spice wealth
+        rankings of the ranking cache, and the classes are assigned with np.digitize.
 
         Args:
             agents (dict): Dictionary of agents
             taxer (BaseTaxer): Taxer object
+            ranking (RankingCache): Holdings and rankings of the agents shared with the taxer
 
         Returns:
             None
 
         """
-        # Get wealth of all agents
-        wealth = {
-            'sugar': [agent.sugar / agent.sugar_metabolism for agent in agents],
-            'spice': [agent.spice / agent.spice_metabolism for agent in agents]
-        }
-
-        # Get class thresholds
-        low_threshold = {}
-        middle_threshold = {}
-        low_n = {}
-        middle_n = {}
-        for key in wealth:
-            # Sort wealth
-            wealth[key].sort()
-
-            # Find class thresholds
-            low_threshold[key], middle_threshold[key], low_n[key], middle_n[key] = class_thresholds(wealth[key])
+        ranking = ranking if ranking is not None else RankingCache(agents)
+        holdings = ranking.holdings
+        n = len(holdings)
+        if n == 0:
+            return
 
-        # Find how much each class gets distributed
-        low_class = {}
-        middle_class = {}
-        high_class = {}
         for key in taxer.taxes_collection:
+            # Find class thresholds in the sorted wealth of the resource
+            wealth = ranking.sorted(f"{key}_wealth")
+            low_threshold, middle_threshold, low_n, middle_n = class_thresholds(wealth)
+
             # Compute how much each class in total gets
-            middle_class[key] = taxer.taxes_collection[key] / 3
-            low_class[key] = middle_class[key] * 4 / 3
-            high_class[key] = middle_class[key] * 2 / 3
+            middle_class = taxer.taxes_collection[key] / 3
+            low_class = middle_class * 4 / 3
+            high_class = middle_class * 2 / 3
 
             # Compute individual class distribution
-            low_class[key] /= low_n[key]
-            middle_class[key] /= (middle_n[key] - low_n[key])
-            high_class[key] /= len(wealth[key]) - middle_n[key]
-
-        # Distribute taxes
-        for agent in agents:
-            # Sugar distribution
-            if agent.sugar / agent.sugar_metabolism < low_threshold["sugar"]:
-                agent.sugar += low_class["sugar"]
-            elif agent.sugar / agent.sugar_metabolism < middle_threshold["sugar"]:
-                agent.sugar += middle_class["sugar"]
-            else:
-                agent.sugar += high_class["sugar"]
+            low_class /= low_n
+            middle_class /= (middle_n - low_n)
+            high_class /= n - middle_n
 
-            # Spice distribution
-            if agent.spice / agent.spice_metabolism < low_threshold["spice"]:
-                agent.spice += low_class["spice"]
-            elif agent.spice / agent.spice_metabolism < middle_threshold["spice"]:
-                agent.spice += middle_class["spice"]
-            else:
-                agent.spice += high_class["spice"]
+            # Distribute taxes, low class below the low threshold and middle class below the middle threshold
+            classes = np.digitize(ranking.key(f"{key}_wealth"), [low_threshold, middle_threshold])
+            holdings.write(key, holdings[key] + np.array([low_class, middle_class, high_class])[classes])
 
         # Reset taxes collection
         taxer.reset_tax()
@@ -1,40 +1,56 @@
 from .BaseDistributer import BaseDistributer
-from numpy import random
+from numpy import floor, full
+from numpy.random import Generator, default_rng
+from src.RankingCache import RankingCache
 from src.Taxers.BaseTaxer import BaseTaxer
 
 
 class RandomDistributer(BaseDistributer):
     """
     Distributes resources randomly to agents. The resources are distributed based on a random selection of agents.
-    The selected agent will receive one unit, and this is repeated until all resources are distributed.
+    Every whole unit collected is given to a uniformly chosen agent, which is drawn for all units at once as a
+    multinomial allocation. A fractional remainder, left by taxers that do not truncate, stays in the taxes
+    collection for the next distribution.
+
+    Attributes:
+        rng (numpy.random.Generator): Random number generator used to select the agents
     """
-    def distribute(self, agents: dict, taxer: BaseTaxer) -> None:
+    def __init__(self, distributer_steps: int, rng: Generator = None):
+        """
+        Constructor for RandomDistributer
+
+        Args:
+            distributer_steps (int): Number of steps between each distribution
+            rng (numpy.random.Generator): Random number generator used to select the agents, usually the one of the
+                model
+        """
+        super().__init__(distributer_steps)
+        self.rng = rng if rng is not None else default_rng()
+
+    def distribute(self, agents: dict, taxer: BaseTaxer, ranking: RankingCache = None) -> None:
         """
-        Distribute according to random scheme.
+        Distribute according to random scheme. The number of units every agent receives is drawn in one multinomial
+        draw with equal probabilities.
 
         Args:
             agents (dict): Dictionary of agents
             taxer (BaseTaxer): Taxer object
+            ranking (RankingCache): Holdings and rankings of the agents shared with the taxer
 
         Returns:
             None
 
         """
-        # Convert agents to a list
-        agents_list = list(agents)
-
-        total_sugar = taxer.taxes_collection["sugar"]
-        total_spice = taxer.taxes_collection["spice"]
-
-        while total_sugar > 0:
-            agent = random.choice(agents_list)
-            agent.sugar += 1
-            total_sugar -= 1
-
-        while total_spice > 0:
-            agent = random.choice(agents_list)
-            agent.spice += 1
-            total_spice -= 1
-
-        # Reset taxes collection
-        taxer.reset_tax()
+        holdings = (ranking if ranking is not None else RankingCache(agents)).holdings
+        if len(holdings) == 0:
+            return
+
+        for resource in ("sugar", "spice"):
+            # Every whole unit is given to a random agent
+            total = taxer.taxes_collection[resource]
+            units = int(floor(total)) if total > 0 else 0
+            received = self.rng.multinomial(units, full(len(holdings), 1 / len(holdings)))
+            holdings.write(resource, holdings[resource] + received, mask=received > 0)
+
+            # Keep the fractional remainder for the next distribution
+            taxer.taxes_collection[resource] = total - units
@@ -1,29 +1,29 @@
-from numpy.random import poisson
-from numpy import maximum
-from .Agents.Cell import Cell
+from numpy import arange, maximum, ndarray, stack, where
+from .ResourceField import ResourceField
 from mesa.model import Model
 
 
 class GridCreator:
     """
-    Class to create a grid for the model
+    Class to create the resource landscape of the model
 
     Attributes:
         model (Model): The model to create the grid for
         map_scheme (str): The scheme to use for the grid creation
         cell_regeneration (float): The amount of energy a cell regenerates each step
+        field (ResourceField): The resource field that is filled by the map scheme
 
     Methods:
         create_grid()
-            Create a grid for the model.
+            Create the resource field for the model.
         uniform_map()
             Create a uniform grid.
         top_heavy_map()
             Create a top heavy grid.
         split_map()
             Create a split grid.
-        place_cell(capacities: list[int], x: int, y: int)
-            Place a cell on the
+        place_cells(capacities: numpy.ndarray)
+            Set the capacities of all cells in the resource field.
     """
     def __init__(self, model: Model, map_scheme: str, cell_regeneration: float):
         """
@@ -37,13 +37,14 @@ class GridCreator:
         self.model = model
         self.map_scheme = map_scheme
         self.cell_regeneration = cell_regeneration
+        self.field = ResourceField(model.grid.width, model.grid.height, cell_regeneration)
 
-    def create_grid(self) -> None:
+    def create_grid(self) -> ResourceField:
         """
-        Create a grid for the model
+        Create the resource field for the model
 
         Returns:
-            None
+            ResourceField: The resource field filled according to the map scheme
         """
         if self.map_scheme == "uniform":
             self.uniform_map()
@@ -52,6 +53,8 @@ class GridCreator:
         elif self.map_scheme == "split":
             self.split_map()
 
+        return self.field
+
     def uniform_map(self) -> None:
         """
         Create a uniform grid
@@ -59,15 +62,14 @@ class GridCreator:
         Returns:
             None
         """
-        for content, (x, y) in self.model.grid.coord_iter():
-            # Generate random capacities
-            capacities = poisson(6, 2)
+        # Generate random capacities for all cells at once
+        capacities = self.model.rng.poisson(6, (2, self.field.width, self.field.height))
 
-            # Minimum has to be 1
-            capacities = maximum(capacities, 1)
+        # Minimum has to be 1
+        capacities = maximum(capacities, 1)
 
-            # Place cell
-            self.place_cell(capacities, x, y)
+        # Place cells
+        self.place_cells(capacities)
 
     def top_heavy_map(self) -> None:
         """
@@ -82,15 +84,15 @@ class GridCreator:
         # Get the middle of the grid
         middle = width // 2
 
-        for content, (x, y) in self.model.grid.coord_iter():
-            # Generate capacities
-            capacities = poisson(11, 2) if y > middle else poisson(1, 2)
+        # Generate capacities, higher in the top half
+        y = arange(height)[None, None, :]
+        capacities = self.model.rng.poisson(where(y > middle, 11, 1), (2, width, height))
 
-            # Minimum has to be 1
-            capacities = maximum(capacities, 1)
+        # Minimum has to be 1
+        capacities = maximum(capacities, 1)
 
-            # Place cell
-            self.place_cell(capacities, x, y)
+        # Place cells
+        self.place_cells(capacities)
 
     def split_map(self) -> None:
         """
@@ -105,33 +107,27 @@ class GridCreator:
         # Get the middle of the grid
         middle = height // 2
 
-        for content, (x, y) in self.model.grid.coord_iter():
-            # Generate capacities
-            capacities = [poisson(10), poisson(2)] if y > middle else [poisson(2), poisson(10)]
+        # Generate capacities, more sugar in the top half and more spice in the bottom half
+        top = arange(height) > middle
+        means = stack([where(top, 10, 2), where(top, 2, 10)])[:, None, :]
+        capacities = self.model.rng.poisson(means, (2, width, height))
 
-            # Minimum has to be 1
-            capacities = maximum(capacities, 1)
+        # Minimum has to be 1
+        capacities = maximum(capacities, 1)
 
-            # Place cell
-            self.place_cell(capacities, x, y)
+        # Place cells
+        self.place_cells(capacities)
 
-    def place_cell(self, capacities: list[int], x: int, y: int) -> None:
+    def place_cells(self, capacities: ndarray) -> None:
         """
-        Place a cell on the grid
+        Set the capacities of all cells in the resource field and fill them
+
         Args:
-            capacities (list[int]): The capacities of the cell for both sugar and spice
-            x (int): The x coordinate of the cell
-            y (int): The y coordinate of the cell
+            capacities (numpy.ndarray): The capacities of all cells, capacities[0] for sugar and capacities[1] for
+                spice, indexed by [x, y]
 
         Returns:
             None
         """
-        # Initialize cell
-        cell = Cell(self.model.last_id, self.model, capacities, self.cell_regeneration)
-
-        # Place cell on grid
-        self.model.grid.place_agent(cell, (x, y))
-        self.model.schedule.add(cell)
-
-        # Increment id
-        self.model.last_id += 1
+        self.field.capacity[:] = capacities
+        self.field.fill()
@@ -0,0 +1,102 @@
+from operator import attrgetter
+
+import numpy as np
+
+from src.Agents.TraderPopulation import PopulationTrader
+
+
+class Holdings:
+    """
+    Columns of attributes of a group of traders, so taxers and distributers can work on arrays instead of looping over
+    the traders. Traders of the "vectorized" engine are read from and written to the columns of their population
+    directly, while the attributes of other traders are gathered in a single pass and written back per trader.
+
+    Attributes:
+        agents (list): The traders, in the order of the columns
+        columns (dict[str, numpy.ndarray]): The gathered attributes
+        population (TraderPopulation): Population of the traders, None if they are not stored in one
+        slots (numpy.ndarray): Slot of every trader in the population, None if they are not stored in one
+        versions (dict[str, int]): Number of times every attribute was written
+
+    Methods:
+        write(name, values, mask=None)
+            Write an attribute back to the traders.
+    """
+    # Attributes gathered by default
+    NAMES = ("sugar", "spice", "sugar_metabolism", "spice_metabolism", "wealth")
+
+    def __init__(self, agents, names: tuple[str, ...] = NAMES):
+        """
+        Constructor for Holdings
+
+        Args:
+            agents (Iterable[Trader]): The traders
+            names (tuple[str, ...]): Attributes to gather
+        """
+        self.agents = list(agents)
+        self.population = None
+        self.slots = None
+        self.versions = {}
+
+        if self.agents and isinstance(self.agents[0], PopulationTrader):
+            self.population = self.agents[0].population
+            self.slots = np.fromiter((agent.slot for agent in self.agents), dtype=np.int64, count=len(self.agents))
+            self.columns = {name: getattr(self.population, name)[self.slots] for name in names}
+            return
+
+        # One row per trader, one column per attribute
+        getter = attrgetter(*names)
+        rows = [getter(agent) for agent in self.agents]
+        if len(names) == 1:
+            rows = [(row,) for row in rows]
+        rows = np.array(rows, dtype=float).reshape(-1, len(names))
+        self.columns = {name: rows[:, i] for i, name in enumerate(names)}
+
+    def __len__(self) -> int:
+        """
+        Number of traders.
+
+        Returns:
+            int: Number of traders
+        """
+        return len(self.agents)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """
+        Get a gathered attribute of all traders.
+
+        Args:
+            name (str): Name of the attribute
+
+        Returns:
+            numpy.ndarray: The attribute of all traders
+        """
+        return self.columns[name]
+
+    def write(self, name: str, values: np.ndarray, mask: np.ndarray = None) -> None:
+        """
+        Write an attribute back to the traders, and update the gathered column.
+
+        Args:
+            name (str): Name of the attribute
+            values (numpy.ndarray): New value for every trader
+            mask (numpy.ndarray): Only write the traders where the mask is True, all traders if not given
+
+        Returns:
+            None
+        """
+        self.versions[name] = self.versions.get(name, 0) + 1
+        if name in self.columns:
+            if mask is None:
+                self.columns[name][:] = values
+            else:
+                self.columns[name][mask] = values[mask]
+
+        if self.population is not None:
+            slots = self.slots if mask is None else self.slots[mask]
+            getattr(self.population, name)[slots] = values if mask is None else values[mask]
+            return
+
+        indices = range(len(self.agents)) if mask is None else np.flatnonzero(mask).tolist()
+        for i in indices:
+            setattr(self.agents[i], name, values[i].item())
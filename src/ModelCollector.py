@@ -0,0 +1,173 @@
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from mesa.model import Model
+
+
+class _StepColumn:
+    """
+    Read-only view of the collected values of one reporter that is indexed by model step, like the lists in the
+    model_vars of Mesa's DataCollector. A step that was not collected returns the value of the last collected step
+    before it, and negative indices count back from the last collected row.
+    """
+    __slots__ = ("collector", "column")
+
+    def __init__(self, collector: "ModelCollector", column: int):
+        self.collector = collector
+        self.column = column
+
+    def __len__(self) -> int:
+        return self.collector.size
+
+    def __iter__(self):
+        return iter(self.collector.values[:self.collector.size, self.column].tolist())
+
+    def __getitem__(self, step: int) -> float:
+        collector = self.collector
+        if step < 0:
+            row = collector.size + step
+        else:
+            row = int(np.searchsorted(collector.steps[:collector.size], step, side="right")) - 1
+        if not 0 <= row < collector.size:
+            raise IndexError("Step was not collected or was drained")
+        return float(collector.values[row, self.column])
+
+
+class ModelCollector:
+    """
+    Columnar collector of model level reporters, used by SugarScape instead of Mesa's DataCollector. The values are
+    written into a preallocated float64 array with one row per collected step and one column per reporter, which is
+    doubled in size when it is full. Data is only collected every collection_period steps, and the latest value of a
+    reporter can be read without building a DataFrame.
+
+    Attributes:
+        model_reporters (dict[str, Callable]): Reporter function of every column
+        collection_period (int): Number of steps between two collected rows
+        capacity (int): Number of rows allocated
+        size (int): Number of collected rows
+        values (numpy.ndarray): Collected values, one row per collected step
+        steps (numpy.ndarray): Step of every collected row
+        agent_reporters (dict): Always empty, kept for Mesa's batch_run
+        _agent_records (dict): Always empty, kept for Mesa's batch_run
+
+    Methods:
+        collect(model)
+            Collect the values of all reporters for the current step.
+        latest(name)
+            Get the last collected value of a reporter.
+        get_model_vars_dataframe()
+            Get the collected values as a DataFrame.
+        drain()
+            Get the collected values as a DataFrame and drop them from memory.
+    """
+    def __init__(self, model_reporters: dict[str, Callable], collection_period: int = 1, capacity: int = 1024):
+        """
+        Constructor for ModelCollector
+
+        Args:
+            model_reporters (dict[str, Callable]): Reporter function of every column, called with the model
+            collection_period (int): Number of steps between two collected rows
+            capacity (int): Number of rows to allocate at the start, the array grows when more are needed
+        """
+        if collection_period < 1:
+            raise ValueError("Invalid collection period")
+        self.model_reporters = dict(model_reporters)
+        self.collection_period = collection_period
+        self._columns = {name: column for column, name in enumerate(self.model_reporters)}
+
+        self.capacity = max(1, capacity)
+        self.size = 0
+        self.values = np.zeros((self.capacity, len(self.model_reporters)))
+        self.steps = np.zeros(self.capacity, dtype=np.int64)
+
+        # Last collected row, kept when the collected rows are drained
+        self._latest = None
+
+        # Mesa's batch_run reads the agent records of every step
+        self.agent_reporters = {}
+        self._agent_records = {}
+
+    @property
+    def model_vars(self) -> dict[str, _StepColumn]:
+        """
+        The collected values of every reporter, indexed by step like the model_vars of Mesa's DataCollector. Steps
+        that were drained raise an IndexError, so Mesa's batch_run cannot read a model that streams to a sink.
+
+        Returns:
+            dict[str, _StepColumn]: The collected values by reporter name
+        """
+        return {name: _StepColumn(self, column) for name, column in self._columns.items()}
+
+    def collect(self, model: Model) -> None:
+        """
+        Collect the values of all reporters for the current step of the model, if it is a multiple of the collection
+        period.
+
+        Args:
+            model (SugarScape): Model to collect the values of
+
+        Returns:
+            None
+        """
+        step = model.current_step
+        if step % self.collection_period != 0:
+            return
+
+        # Grow the array when it is full
+        if self.size == self.capacity:
+            self.capacity *= 2
+            values = np.zeros((self.capacity, len(self.model_reporters)))
+            values[:self.size] = self.values[:self.size]
+            steps = np.zeros(self.capacity, dtype=np.int64)
+            steps[:self.size] = self.steps[:self.size]
+            self.values, self.steps = values, steps
+
+        row = self.values[self.size]
+        for column, reporter in enumerate(self.model_reporters.values()):
+            row[column] = reporter(model)
+        self.steps[self.size] = step
+        self.size += 1
+
+    def latest(self, name: str) -> float:
+        """
+        Get the last collected value of a reporter, also after the collected rows were drained.
+
+        Args:
+            name (str): Name of the reporter
+
+        Returns:
+            float: The last collected value
+        """
+        if self.size > 0:
+            return float(self.values[self.size - 1, self._columns[name]])
+        if self._latest is None:
+            raise IndexError("No data collected")
+        return float(self._latest[self._columns[name]])
+
+    def get_model_vars_dataframe(self) -> pd.DataFrame:
+        """
+        Get the collected values as a DataFrame with one column per reporter, indexed by step. The DataFrame is built
+        on the collected array without copying it, so it should be copied before the model is stepped further if it is
+        kept.
+
+        Returns:
+            pd.DataFrame: The collected values
+        """
+        return pd.DataFrame(self.values[:self.size], columns=list(self.model_reporters),
+                            index=self.steps[:self.size], copy=False)
+
+    def drain(self) -> pd.DataFrame:
+        """
+        Get the collected values as a DataFrame with a "Step" column and drop them from memory, so the collector stays
+        bounded when the values are streamed to disk. Only the last row is kept for latest().
+
+        Returns:
+            pd.DataFrame: The values collected since the last drain
+        """
+        frame = self.get_model_vars_dataframe().copy()
+        frame.insert(0, "Step", frame.index)
+        if self.size > 0:
+            self._latest = self.values[self.size - 1].copy()
+        self.size = 0
+        return frame.reset_index(drop=True)
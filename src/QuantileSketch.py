@@ -0,0 +1,192 @@
+from math import ceil
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch in the style of KLL. Values are kept in a stack of compactors, where a value at level h
+    stands for 2^h of the original values. When a compactor holds more values than its capacity, it is sorted and
+    every other value (starting at a random offset) is promoted to the next level, which halves its size while keeping
+    the ranks unbiased. The capacity shrinks by a factor 2/3 for every level below the top, so the sketch holds
+    O(k) values however many are added, with a rank error of roughly 1/k.
+
+    Sketches with the same k can be merged, so the wealth distributions of replicates run in different processes can
+    be combined by shipping the sketches (see to_dict and from_dict) instead of the raw wealth arrays.
+
+    Attributes:
+        k (int): Capacity of the top compactor, which sets the accuracy of the sketch
+        compactors (list[numpy.ndarray]): Values kept at every level
+        count (int): Number of values added
+        minimum (float): Lowest value added
+        maximum (float): Highest value added
+        rng (numpy.random.Generator): Random number generator used for the compaction offsets
+
+    Methods:
+        update(values)
+            Add values to the sketch.
+        merge(other)
+            Add all values of another sketch.
+        quantile(q)
+            Get approximate quantiles of the added values.
+        to_dict()
+            Get the sketch as a dictionary of plain Python values.
+        from_dict(state)
+            Create a sketch from a dictionary made by to_dict.
+    """
+    def __init__(self, k: int = 200, rng: np.random.Generator = None):
+        """
+        Constructor for QuantileSketch
+
+        Args:
+            k (int): Capacity of the top compactor, which sets the accuracy of the sketch
+            rng (numpy.random.Generator): Random number generator used for the compaction offsets
+        """
+        if k < 2:
+            raise ValueError("Invalid sketch size")
+        self.k = k
+        self.compactors = [np.zeros(0)]
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self) -> int:
+        """
+        Number of values added.
+
+        Returns:
+            int: Number of values added
+        """
+        return self.count
+
+    def _capacity(self, level: int) -> int:
+        """
+        Capacity of a compactor, which shrinks by a factor 2/3 for every level below the top.
+
+        Args:
+            level (int): Level of the compactor
+
+        Returns:
+            int: Maximum number of values kept at the level
+        """
+        depth = len(self.compactors) - level - 1
+        return max(2, ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self) -> None:
+        """
+        Compact every level that holds more values than its capacity, from the bottom up.
+
+        Returns:
+            None
+        """
+        level = 0
+        while level < len(self.compactors):
+            values = self.compactors[level]
+            if len(values) > self._capacity(level):
+                if level + 1 == len(self.compactors):
+                    self.compactors.append(np.zeros(0))
+
+                # Keep one value at this level if the number of values is odd
+                values = np.sort(values)
+                keep = len(values) % 2
+                promoted = values[keep:][int(self.rng.integers(2))::2]
+                self.compactors[level] = values[:keep]
+                self.compactors[level + 1] = np.concatenate((self.compactors[level + 1], promoted))
+            level += 1
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add values to the sketch.
+
+        Args:
+            values (numpy.ndarray): The values to add
+
+        Returns:
+            None
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self.compactors[0] = np.concatenate((self.compactors[0], values))
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Add all values of another sketch, level by level.
+
+        Args:
+            other (QuantileSketch): The sketch to merge, with the same k
+
+        Returns:
+            None
+        """
+        if other.k != self.k:
+            raise ValueError("Sketches with a different k cannot be merged")
+
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.zeros(0))
+        for level, values in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate((self.compactors[level], values))
+
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress()
+
+    def quantile(self, q: float | np.ndarray) -> float | np.ndarray:
+        """
+        Get approximate quantiles of the added values.
+
+        Args:
+            q (float | numpy.ndarray): Quantiles between 0 and 1
+
+        Returns:
+            float | numpy.ndarray: The approximate values at the quantiles, NaN if no values were added
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        # Every value stands for 2^level of the original values
+        values = np.concatenate(self.compactors)
+        weights = np.concatenate([np.full(len(compactor), 2.0 ** level)
+                                  for level, compactor in enumerate(self.compactors)])
+        order = np.argsort(values)
+        values, ranks = values[order], np.cumsum(weights[order])
+
+        index = np.searchsorted(ranks, np.asarray(q) * ranks[-1], side="left")
+        result = np.clip(values[np.minimum(index, len(values) - 1)], self.minimum, self.maximum)
+        return float(result) if np.ndim(q) == 0 else result
+
+    def to_dict(self) -> dict:
+        """
+        Get the sketch as a dictionary of plain Python values, to send it between processes or store it as JSON.
+
+        Returns:
+            dict: The state of the sketch
+        """
+        return {"k": self.k, "count": self.count, "minimum": self.minimum, "maximum": self.maximum,
+                "compactors": [values.tolist() for values in self.compactors]}
+
+    @classmethod
+    def from_dict(cls, state: dict, rng: np.random.Generator = None) -> "QuantileSketch":
+        """
+        Create a sketch from a dictionary made by to_dict.
+
+        Args:
+            state (dict): The state of the sketch
+            rng (numpy.random.Generator): Random number generator used for the compaction offsets
+
+        Returns:
+            QuantileSketch: The restored sketch
+        """
+        sketch = cls(state["k"], rng)
+        sketch.count = state["count"]
+        sketch.minimum = state["minimum"]
+        sketch.maximum = state["maximum"]
+        sketch.compactors = [np.asarray(values, dtype=float) for values in state["compactors"]]
+        return sketch
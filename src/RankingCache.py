@@ -0,0 +1,135 @@
+import numpy as np
+
+from src.Holdings import Holdings
+
+
+class RankingCache:
+    """
+    Per-step cache of the holdings of all traders and of their rankings by the sort keys used by the taxers and the
+    distributers. The holdings are gathered once, on first use, and every key and its (stable) argsort are computed
+    once and shared by every consumer. A cached key is recomputed only when one of the columns it depends on was
+    written since, for example when the taxes change the sugar and spice of the traders.
+
+    Attributes:
+        agents (Iterable[Trader]): The traders
+        KEYS (dict): The columns every sort key depends on
+
+    Methods:
+        holdings
+            The holdings of all traders.
+        key(name)
+            Get the values of a sort key for every trader.
+        order(name, descending=False)
+            Get the stable argsort of a sort key.
+        sorted(name)
+            Get the values of a sort key sorted from low to high.
+    """
+    # Columns every sort key depends on
+    KEYS = {
+        "wealth": ("wealth",),
+        "sugar_wealth": ("sugar", "sugar_metabolism"),
+        "spice_wealth": ("spice", "spice_metabolism"),
+        "sugar_need": ("sugar", "sugar_metabolism"),
+        "spice_need": ("spice", "spice_metabolism"),
+    }
+
+    def __init__(self, agents):
+        """
+        Constructor for RankingCache
+
+        Args:
+            agents (Iterable[Trader]): The traders
+        """
+        self.agents = agents
+        self._holdings = None
+        self._keys = {}
+        self._orders = {}
+
+    @property
+    def holdings(self) -> Holdings:
+        """
+        The holdings of all traders, gathered on first use.
+
+        Returns:
+            Holdings: The holdings of all traders
+        """
+        if self._holdings is None:
+            self._holdings = Holdings(self.agents)
+        return self._holdings
+
+    def _versions(self, name: str) -> tuple[int, ...]:
+        """
+        Get the write versions of the columns a sort key depends on.
+
+        Args:
+            name (str): Name of the sort key
+
+        Returns:
+            tuple[int, ...]: The version of every column
+        """
+        return tuple(self.holdings.versions.get(column, 0) for column in self.KEYS[name])
+
+    def key(self, name: str) -> np.ndarray:
+        """
+        Get the values of a sort key for every trader: the cached wealth, the sugar or spice wealth (holdings divided
+        by metabolism), or the sugar or spice need (metabolism exceeding the holdings).
+
+        Args:
+            name (str): Name of the sort key
+
+        Returns:
+            numpy.ndarray: The values of the sort key
+        """
+        if name not in self.KEYS:
+            raise ValueError("Invalid sort key")
+
+        versions = self._versions(name)
+        if name in self._keys and self._keys[name][0] == versions:
+            return self._keys[name][1]
+
+        holdings = self.holdings
+        if name == "wealth":
+            values = holdings["wealth"]
+        else:
+            resource, kind = name.split("_")
+            if kind == "wealth":
+                values = holdings[resource] / holdings[f"{resource}_metabolism"]
+            else:
+                values = np.maximum(0, holdings[f"{resource}_metabolism"] - holdings[resource])
+
+        self._keys[name] = (versions, values)
+        return values
+
+    def order(self, name: str, descending: bool = False) -> np.ndarray:
+        """
+        Get the stable argsort of a sort key. Descending orders keep traders with equal values in their original
+        order, like sorted(..., reverse=True).
+
+        Args:
+            name (str): Name of the sort key
+            descending (bool): Whether to sort from high to low
+
+        Returns:
+            numpy.ndarray: Indices of the traders in sorted order
+        """
+        values = self.key(name)
+        versions = self._versions(name)
+        cached = self._orders.get((name, descending))
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+
+        order = np.argsort(-values if descending else values, kind="stable")
+        self._orders[(name, descending)] = (versions, order)
+        return order
+
+    def sorted(self, name: str) -> np.ndarray:
+        """
+        Get the values of a sort key sorted from low to high.
+
+        Args:
+            name (str): Name of the sort key
+
+        Returns:
+            numpy.ndarray: The sorted values
+        """
+        return self.key(name)[self.order(name)]
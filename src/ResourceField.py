@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class ResourceField:
+    """
+    Sugar and spice landscape of the model, stored as NumPy arrays indexed by grid position [x, y].
+
+    Attributes:
+        width (int): The width of the field (number of x positions)
+        height (int): The height of the field (number of y positions)
+        cell_regeneration (float): The amount of sugar and spice every cell regenerates each step
+        capacity (numpy.ndarray): Capacities of the cells, capacity[0] for sugar and capacity[1] for spice
+        sugar (numpy.ndarray): Sugar currently available in each cell
+        spice (numpy.ndarray): Spice currently available in each cell
+
+    Methods:
+        fill()
+            Fill every cell up to its capacity.
+        regenerate()
+            Regenerate sugar and spice in every cell.
+        harvest(x, y)
+            Take all sugar and spice from a cell.
+    """
+    def __init__(self, width: int, height: int, cell_regeneration: float):
+        """
+        Constructor for ResourceField
+
+        Args:
+            width (int): The width of the field (number of x positions)
+            height (int): The height of the field (number of y positions)
+            cell_regeneration (float): The amount of sugar and spice every cell regenerates each step
+        """
+        self.width = width
+        self.height = height
+        self.cell_regeneration = cell_regeneration
+
+        # Capacities and current resources of the cells
+        self.capacity = np.zeros((2, width, height))
+        self.sugar = np.zeros((width, height))
+        self.spice = np.zeros((width, height))
+
+    def fill(self) -> None:
+        """
+        Fill every cell up to its capacity.
+
+        Returns:
+            None
+        """
+        self.sugar[:] = self.capacity[0]
+        self.spice[:] = self.capacity[1]
+
+    def regenerate(self) -> None:
+        """
+        Regenerate sugar and spice in every cell, without exceeding the capacities.
+
+        Returns:
+            None
+        """
+        np.minimum(self.sugar + self.cell_regeneration, self.capacity[0], out=self.sugar)
+        np.minimum(self.spice + self.cell_regeneration, self.capacity[1], out=self.spice)
+
+    def harvest(self, x: int, y: int) -> tuple[float, float]:
+        """
+        Take all sugar and spice from a cell.
+
+        Args:
+            x (int): The x coordinate of the cell
+            y (int): The y coordinate of the cell
+
+        Returns:
+            tuple[float, float]: The sugar and spice that were in the cell
+        """
+        sugar = float(self.sugar[x, y])
+        spice = float(self.spice[x, y])
+        self.sugar[x, y] = 0
+        self.spice[x, y] = 0
+
+        return sugar, spice
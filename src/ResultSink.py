@@ -0,0 +1,88 @@
+import os
+from importlib.util import find_spec
+
+import pandas as pd
+
+
+class ResultSink:
+    """
+    Streaming sink that writes the results of a run to disk in chunks, so the model can drop them from memory. Every
+    write of a table is stored as a separate Parquet file (one row group), or appended to a CSV file of the table when
+    pyarrow is not installed. Every chunk is complete on disk once it is written, so the results up to the last flush
+    survive a crash.
+
+    Attributes:
+        directory (str): Directory the tables are written to
+        format (str): The file format, either "parquet" or "csv"
+        parts (dict[str, int]): Number of chunks written per table
+
+    Methods:
+        write(table, frame)
+            Write a chunk of a table.
+        read(table)
+            Read all chunks of a table back.
+    """
+    FORMATS = ("auto", "parquet", "csv")
+
+    def __init__(self, directory: str, format: str = "auto"):
+        """
+        Constructor for ResultSink
+
+        Args:
+            directory (str): Directory the tables are written to, created if it does not exist
+            format (str): The file format, "parquet", "csv" or "auto" to use Parquet if pyarrow is installed
+        """
+        if format not in self.FORMATS:
+            raise ValueError("Invalid sink format")
+        has_pyarrow = find_spec("pyarrow") is not None
+        if format == "auto":
+            format = "parquet" if has_pyarrow else "csv"
+        elif format == "parquet" and not has_pyarrow:
+            raise ImportError("pyarrow is required to write Parquet files")
+
+        self.directory = directory
+        self.format = format
+        self.parts = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, table: str, frame: pd.DataFrame) -> None:
+        """
+        Write a chunk of a table. Empty chunks are skipped.
+
+        Args:
+            table (str): Name of the table
+            frame (pd.DataFrame): The rows to write, the index is not written
+
+        Returns:
+            None
+        """
+        if frame.empty:
+            return
+
+        part = self.parts.get(table, 0)
+        if self.format == "parquet":
+            path = os.path.join(self.directory, f"{table}-{part:05d}.parquet")
+            frame.to_parquet(path, index=False)
+        else:
+            path = os.path.join(self.directory, f"{table}.csv")
+            frame.to_csv(path, mode="w" if part == 0 else "a", header=part == 0, index=False)
+        self.parts[table] = part + 1
+
+    def read(self, table: str) -> pd.DataFrame:
+        """
+        Read all chunks of a table back into one DataFrame.
+
+        Args:
+            table (str): Name of the table
+
+        Returns:
+            pd.DataFrame: All rows written to the table
+        """
+        parts = self.parts.get(table, 0)
+        if parts == 0:
+            return pd.DataFrame()
+        if self.format == "csv":
+            return pd.read_csv(os.path.join(self.directory, f"{table}.csv"))
+
+        paths = [os.path.join(self.directory, f"{table}-{part:05d}.parquet") for part in range(parts)]
+        return pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Fixed-size history of numbers that keeps only the last capacity values. It supports the list operations the model
+    uses on its per-step histories (append, len, indexing from the end, iteration and clear), so it can replace those
+    lists when memory has to stay bounded.
+
+    Attributes:
+        capacity (int): Maximum number of values kept
+        values (numpy.ndarray): Storage of the values, in circular order
+        start (int): Index of the oldest value in the storage
+        size (int): Number of values kept
+
+    Methods:
+        append(value)
+            Add a value, dropping the oldest one if the buffer is full.
+        clear()
+            Remove all values.
+        to_array()
+            Get the kept values as an array, oldest first.
+    """
+    def __init__(self, capacity: int, dtype: type = float):
+        """
+        Constructor for RingBuffer
+
+        Args:
+            capacity (int): Maximum number of values kept
+            dtype (type): Type of the values, int for counters
+        """
+        if capacity < 1:
+            raise ValueError("Invalid ring buffer capacity")
+        self.capacity = capacity
+        self.values = np.zeros(capacity, dtype=dtype)
+        self.start = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        """
+        Number of values kept.
+
+        Returns:
+            int: Number of values kept
+        """
+        return self.size
+
+    def __getitem__(self, index: int) -> int | float:
+        """
+        Get a kept value, 0 is the oldest and -1 the newest.
+
+        Args:
+            index (int): Position of the value
+
+        Returns:
+            int | float: The value, as a Python number of the type of the buffer
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("Ring buffer index out of range")
+        return self.values[(self.start + index) % self.capacity].item()
+
+    def __iter__(self):
+        """
+        Iterate over the kept values, oldest first.
+
+        Returns:
+            Iterator[int | float]: The kept values
+        """
+        return iter(self.to_array().tolist())
+
+    def append(self, value: int | float) -> None:
+        """
+        Add a value, dropping the oldest one if the buffer is full.
+
+        Args:
+            value (int | float): The value to add
+
+        Returns:
+            None
+        """
+        if self.size < self.capacity:
+            self.values[(self.start + self.size) % self.capacity] = value
+            self.size += 1
+        else:
+            self.values[self.start] = value
+            self.start = (self.start + 1) % self.capacity
+
+    def clear(self) -> None:
+        """
+        Remove all values.
+
+        Returns:
+            None
+        """
+        self.start = 0
+        self.size = 0
+
+    def to_array(self) -> np.ndarray:
+        """
+        Get the kept values as an array, oldest first.
+
+        Returns:
+            numpy.ndarray: The kept values
+        """
+        return np.roll(self.values, -self.start)[:self.size]
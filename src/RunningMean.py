@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class RunningMean:
+    """
+    Running sum and count of the values added in a step, used instead of a list of all values when only their mean is
+    needed. Values are added with append and extend, like the list it replaces.
+
+    Attributes:
+        total (float): Sum of the added values
+        count (int): Number of added values
+
+    Methods:
+        append(value)
+            Add a single value.
+        extend(values)
+            Add an array of values.
+        mean()
+            Get the mean of the added values.
+        reset()
+            Remove all values.
+    """
+    def __init__(self):
+        """
+        Constructor for RunningMean
+        """
+        self.total = 0.0
+        self.count = 0
+
+    def __len__(self) -> int:
+        """
+        Number of added values.
+
+        Returns:
+            int: Number of added values
+        """
+        return self.count
+
+    def append(self, value: float) -> None:
+        """
+        Add a single value.
+
+        Args:
+            value (float): The value to add
+
+        Returns:
+            None
+        """
+        self.total += value
+        self.count += 1
+
+    def extend(self, values: np.ndarray) -> None:
+        """
+        Add an array of values.
+
+        Args:
+            values (numpy.ndarray): The values to add
+
+        Returns:
+            None
+        """
+        self.total += float(np.sum(values))
+        self.count += len(values)
+
+    def mean(self) -> float:
+        """
+        Get the mean of the added values, NaN if no values were added like np.mean of an empty list.
+
+        Returns:
+            float: The mean of the added values
+        """
+        if self.count == 0:
+            return np.nan
+        return self.total / self.count
+
+    def reset(self) -> None:
+        """
+        Remove all values.
+
+        Returns:
+            None
+        """
+        self.total = 0.0
+        self.count = 0
@@ -1,12 +1,12 @@
 from typing import List
 from mesa_viz_tornado.modules import ChartModule
 from src.SugarScape import SugarScape
-from src.Agents.Cell import Cell
 from src.Agents.Trader import Trader
+from src.ResourceField import ResourceField
 from mesa.visualization import CanvasGrid, ModularServer, TextElement
 from mesa.visualization.modules import ChartModule
 from mesa.agent import Agent
-import math
+import numpy as np
 
 
 def create_legend() -> TextElement:
@@ -72,39 +72,69 @@ def agent_portrayal(agent: Trader) -> dict:
                  "w": 1,
                  "h": 1}
 
-    if type(agent) is Trader:
+    if isinstance(agent, Trader):
         portrayal["Color"] = "red"
         portrayal["Layer"] = 1
         portrayal["Shape"] = "circle"
-    elif type(agent) is Cell:
-        portrayal["Shape"] = "rect"
-
-        # Calculate total resources
-        total_resources = agent.sugar + agent.spice
-
-        # Calculate intensity using a logarithmic scale
-        if total_resources > 0:
-            intensity = min(int(math.log(total_resources + 1) / math.log(10) * 51), 255)
-        else:
-            intensity = 0
-
-        if agent.sugar > agent.spice:
-            # Brighter green gradient for sugar-dominant cells
-            portrayal["Color"] = f"rgba(0, 255, 0, {intensity / 255})"
-        elif agent.spice > agent.sugar:
-            # Brighter blue gradient for spice-dominant cells
-            portrayal["Color"] = f"rgba(0, 0, 255, {intensity / 255})"
-        elif agent.sugar > 0 and agent.spice > 0:
-            # Brighter yellow gradient for balanced cells
-            portrayal["Color"] = f"rgba(255, 255, 0, {intensity / 255})"
-        else:
-            portrayal["Color"] = "black"  # No resources
-
-        portrayal["Layer"] = 0
 
     return portrayal
 
 
+def cell_portrayal(field: ResourceField) -> list[dict]:
+    """
+    This function is used to define how the cells are displayed in the visualization. The colors are computed directly
+    from the sugar and spice arrays of the resource field.
+
+    Args:
+        field (ResourceField): The resource field to be displayed.
+
+    Returns:
+        list[dict]: A list containing the portrayal of every cell.
+
+    """
+    # Calculate total resources
+    total_resources = field.sugar + field.spice
+
+    # Calculate intensity using a logarithmic scale
+    with np.errstate(divide='ignore', invalid='ignore'):
+        intensity = np.log(total_resources + 1) / np.log(10) * 51
+    intensity = np.where(total_resources > 0, np.minimum(intensity, 255), 0).astype(int)
+
+    portrayals = []
+    for x in range(field.width):
+        for y in range(field.height):
+            sugar = field.sugar[x, y]
+            spice = field.spice[x, y]
+            alpha = intensity[x, y] / 255
+
+            if sugar > spice:
+                # Brighter green gradient for sugar-dominant cells
+                color = f"rgba(0, 255, 0, {alpha})"
+            elif spice > sugar:
+                # Brighter blue gradient for spice-dominant cells
+                color = f"rgba(0, 0, 255, {alpha})"
+            elif sugar > 0 and spice > 0:
+                # Brighter yellow gradient for balanced cells
+                color = f"rgba(255, 255, 0, {alpha})"
+            else:
+                color = "black"  # No resources
+
+            portrayals.append({"Filled": "true", "Shape": "rect", "w": 1, "h": 1, "Color": color, "Layer": 0,
+                               "x": x, "y": y})
+
+    return portrayals
+
+
+class ResourceCanvasGrid(CanvasGrid):
+    """
+    Canvas grid that draws the traders on top of the resource field of the model.
+    """
+    def render(self, model: SugarScape) -> dict:
+        grid_state = super().render(model)
+        grid_state[0] = cell_portrayal(model.resource_field)
+        return grid_state
+
+
 def create_canvas(width, height) -> CanvasGrid:
     """
     This function creates the canvas grid for the visualization.
@@ -113,7 +143,7 @@ def create_canvas(width, height) -> CanvasGrid:
         CanvasGrid: The canvas grid element.
 
     """
-    return CanvasGrid(agent_portrayal, width, height, 500, 500)
+    return ResourceCanvasGrid(agent_portrayal, width, height, 500, 500)
 
 
 def create_chart_module() -> list:
@@ -198,7 +228,8 @@ class Server:
                 "repopulate_factor": repopulate_factor,
                 "map_scheme": map_scheme,
                 "cell_regeneration": cell_regeneration,
-                "track_scheme": "server"
+                "track_scheme": "server",
+                "history_size": 1000
             }
         )
 
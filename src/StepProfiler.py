@@ -0,0 +1,184 @@
+import json
+from contextlib import nullcontext
+from time import perf_counter
+
+import pandas as pd
+
+
+class _PhaseTimer:
+    """
+    Context manager that adds the wall time and a call to one phase of a StepProfiler.
+    """
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "StepProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.times[self.name] = self.profiler.times.get(self.name, 0.0) + perf_counter() - self.start
+        self.profiler.calls[self.name] = self.profiler.calls.get(self.name, 0) + 1
+
+
+class StepProfiler:
+    """
+    Opt-in profiler of the model step. It records the wall time and the number of calls of every phase of a step
+    (regeneration, move, pick_up, trade, ...), together with counters of the hot paths such as the number of cells
+    examined when moving and the number of trade loop iterations. A disabled profiler returns a shared no-op context,
+    so the instrumentation costs next to nothing when profiling is off.
+
+    Attributes:
+        enabled (bool): Whether the profiler records anything
+        times (dict): Wall time of every phase in the current step
+        calls (dict): Number of calls of every phase in the current step
+        counters (dict): Hot path counters of the current step
+        records (list[dict]): One record per finished step
+        current_step (int): The step that is being recorded
+
+    Methods:
+        phase(name)
+            Get a context manager that times a phase.
+        count(name, n=1)
+            Increment a hot path counter.
+        start_step(step)
+            Start recording a new step.
+        end_step()
+            Finish recording the current step.
+        to_dataframe()
+            Get the recorded steps as a DataFrame.
+        summary()
+            Get the total time and calls of every phase and the totals of every counter.
+        to_json(path=None)
+            Dump the recorded run as JSON.
+    """
+    def __init__(self, enabled: bool = True):
+        """
+        Constructor for StepProfiler
+
+        Args:
+            enabled (bool): Whether the profiler records anything
+        """
+        self.enabled = enabled
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+        self.records = []
+        self.current_step = 0
+        self._timers = {}
+        self._disabled = nullcontext()
+
+    def phase(self, name: str) -> _PhaseTimer | nullcontext:
+        """
+        Get a context manager that adds the wall time of its body to a phase.
+
+        Args:
+            name (str): Name of the phase
+
+        Returns:
+            _PhaseTimer | nullcontext: The timer of the phase, or a no-op context if the profiler is disabled
+        """
+        if not self.enabled:
+            return self._disabled
+
+        if name not in self._timers:
+            self._timers[name] = _PhaseTimer(self, name)
+        return self._timers[name]
+
+    def count(self, name: str, n: int = 1) -> None:
+        """
+        Increment a hot path counter.
+
+        Args:
+            name (str): Name of the counter
+            n (int): Amount to add
+
+        Returns:
+            None
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def start_step(self, step: int) -> None:
+        """
+        Start recording a new step.
+
+        Args:
+            step (int): The step of the model
+
+        Returns:
+            None
+        """
+        self.current_step = step
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+
+    def end_step(self) -> None:
+        """
+        Finish recording the current step and store its record.
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            return
+
+        record = {"step": self.current_step}
+        for name, seconds in self.times.items():
+            record[f"{name}_time"] = seconds
+            record[f"{name}_calls"] = self.calls[name]
+        record.update(self.counters)
+        self.records.append(record)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Get the recorded steps as a DataFrame, with one row per step and a time and calls column per phase. Phases
+        or counters that did not occur in a step are zero.
+
+        Returns:
+            pd.DataFrame: The recorded steps indexed by step
+        """
+        if not self.records:
+            return pd.DataFrame()
+
+        return pd.DataFrame(self.records).fillna(0).set_index("step")
+
+    def summary(self) -> dict:
+        """
+        Get the total time and calls of every phase and the totals of every counter over all recorded steps.
+
+        Returns:
+            dict: The phases with their total time, calls and share of the profiled time, and the counter totals
+        """
+        totals = self.to_dataframe().sum()
+        phases = {name[:-5]: {"time": float(totals[name]), "calls": int(totals[f"{name[:-5]}_calls"])}
+                  for name in totals.index if name.endswith("_time") and name != "step_time"}
+        counters = {name: int(totals[name]) for name in totals.index if not name.endswith(("_time", "_calls"))}
+
+        # Share of the step time spent in every phase
+        step_time = float(totals.get("step_time", 0))
+        for name, phase in phases.items():
+            phase["share"] = phase["time"] / step_time if step_time > 0 else 0.0
+
+        return {"steps": len(self.records), "step_time": step_time, "phases": phases, "counters": counters}
+
+    def to_json(self, path: str = None) -> str:
+        """
+        Dump the recorded run as JSON, with the summary and the record of every step.
+
+        Args:
+            path (str): File to write the JSON to, only returned as a string if not given
+
+        Returns:
+            str: The JSON dump
+        """
+        dump = json.dumps({"summary": self.summary(), "steps": self.records}, indent=2)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(dump)
+
+        return dump
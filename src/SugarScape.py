@@ -1,33 +1,54 @@
 # MESA imports
 from mesa import Model
-from mesa.space import MultiGrid
 from mesa.time import RandomActivationByType
-from mesa.datacollection import DataCollector
 
 # Agents
 from src.Agents.Trader import Trader
+from src.Agents.TraderPopulation import TraderPopulation, PopulationTrader
 
 # Taxers
 from src.Taxers.BaseTaxer import BaseTaxer
 from src.Taxers.ProgressiveTaxer import ProgressiveTaxer
 from src.Taxers.RegressiveTaxer import RegressiveTaxer
 from src.Taxers.LuxuryTaxer import LuxuryTaxer
+from src.Taxers.BracketTaxer import BracketTaxer
 
 # Distributers
 from src.Distributers.BaseDistributer import BaseDistributer
 from src.Distributers.ProgressiveDistributer import ProgressiveDistributer
 from src.Distributers.NeedsBasedDistributer import NeedsBasedDistributer
 from src.Distributers.RandomDistributer import RandomDistributer
+from src.RankingCache import RankingCache
 
-# GridCreator
+# Grid
 from src.GridCreator import GridCreator
+from src.TraderGrid import TraderGrid
+
+# Trading
+from src.trading import adjacent_pairs, batched_trade
+
+# Profiling
+from src.StepProfiler import StepProfiler
+
+# Trade log
+from src.TradeLog import TradeLog
+
+# Trader snapshot
+from src.TraderSnapshot import TraderSnapshot
+
+# Data collection
+from src.ModelCollector import ModelCollector
+from src.ResultSink import ResultSink
+from src.RingBuffer import RingBuffer
+from src.RunningMean import RunningMean
 
 # Statistics
 from .statistics import *
+from src.inequality import inequality_reporters
+from src.QuantileSketch import QuantileSketch
 
 # Numpy and Pandas
 import numpy as np
-from numpy import random
 import pandas as pd
 
 
@@ -40,6 +61,8 @@ class SugarScape(Model):
         width (int): The width of the grid.
         initial_population (int): The number of traders to start with.
         current_step (int): The current step of the model.
+        seed_sequence (numpy.random.SeedSequence): The seed sequence of the model, used to spawn independent streams.
+        rng (numpy.random.Generator): The random number generator used by all components of the model.
         tax_rate (float): The tax rate to apply to all trades.
         metabolism_mean (float): The mean metabolism for traders.
         vision_mean (float): The mean vision for traders.
@@ -48,21 +71,49 @@ class SugarScape(Model):
         cell_regeneration (float): The amount of sugar to regenerate in each cell.
         spice_metabolism_snapshot (numpy.ndarray): A 3D array to store the spice metabolism of agents at each position on the grid.
         taxer (BaseTaxer): The taxer object to apply taxes to trades.
+        ranking (RankingCache): The holdings and wealth rankings of the traders shared by the taxer and the
+            distributer, only set while they run.
         distributer (BaseDistributer): The distributer object to distribute taxes to traders.
         repopulate_factor (int): The factor used to determine when to repopulate traders.
         schedule (RandomActivationByType): The schedule to activate agents.
-        grid (MultiGrid): The grid to place agents on.
-        deaths_age (list): A list to store the number of deaths by age at each step.
-        deaths_starved (list): A list to store the number of deaths by hunger at each step.
+        grid (TraderGrid): The grid to place agents on, keeping track of the occupied cells.
+        resource_field (ResourceField): The sugar and spice available in every cell of the grid.
+        history_size (int): The number of steps kept in the per-step histories, None to keep all steps.
+        deaths_age (list | RingBuffer): A list to store the number of deaths by age at each step.
+        deaths_starved (list | RingBuffer): A list to store the number of deaths by hunger at each step.
         deaths_age_step (int): The number of deaths by age at the current step.
         deaths_starved_step (int): The number of deaths by hunger at the current step.
-        reproduced (list): A list to store the number of traders reproduced at each step.
+        reproduced (list | RingBuffer): A list to store the number of traders reproduced at each step.
         reproduced_step (int): The number of traders reproduced at the current step.
-        averagewealth (list): A list to store the average wealth of traders at each step.
-        wealth_step (list): A list to store the wealth of traders at the current step.
+        averagewealth (list | RingBuffer): A list to store the average wealth of traders at each step.
+        wealth_step (RunningMean): The running mean of the wealth of traders at the current step.
+        trade_count_step (int): The number of units traded at the current step.
+        trade_log_price_sum_step (float): The sum of the log of the trade price of every unit traded at the current
+            step.
+        trade_log_price_squares_step (float): The sum of the squared log of the trade price of every unit traded at
+            the current step.
         traders (dict): A dictionary to store the traders in the model.
+        birth_queue (int): The number of traders to be born at the end of the current step.
+        death_queue (list): The traders that died in the current step and are removed at the end of it.
+        engine (str): The engine used to update the traders, either "agent" or "vectorized".
+        population (TraderPopulation): Columnar storage of the traders, only used by the "vectorized" engine.
+        trade_rows (str): Granularity of the trade log, either "pair" or "unit".
+        trade_scheme (str): How trades are resolved, either "sequential" or "batched".
+        profiler (StepProfiler): Records the time spent in every phase of a step, disabled unless profiling is on.
         last_id (int): The last id assigned to a trader.
-        datacollector (DataCollector): The data collector to collect data.
+        trade_log (TradeLog): Columnar log of all trades.
+        trade_logging (str): The requested level of the trade log, "auto" to derive it from the reporters.
+        trade_sample_size (int): The number of trades sampled per step with the "sample" trade logging level.
+        gini_mode (str): How the Gini coefficient is computed, either "exact", "approximate" or "auto".
+        segregation_bands (tuple[int, int]): The first y coordinate of the middle and the upper region, None to scale
+            them with the height of the grid.
+        trader_snapshot (TraderSnapshot): Columnar snapshot of the living traders shared by the reporters.
+        collection_period (int): The number of steps between two collected rows of the data collector.
+        datacollector (ModelCollector): The data collector to collect data.
+        wealth_sketch (QuantileSketch): Sketch of the wealth of every trader at every step, only kept with the
+            "inequality" track scheme.
+        sink (ResultSink): Streams the collected data to disk, None to keep all data in memory.
+        flush_every (int): The number of steps between two flushes to the sink.
         running (bool): A flag to indicate if the model is running.
 
     Methods:
@@ -71,11 +122,31 @@ class SugarScape(Model):
         run_model(step_count=200)
             Run the model for a specified number of steps.
         get_trade_log()
-            Get the trade log from the data collector.
+            Get the trade log as a DataFrame.
+        _history(dtype=float)
+            Create a per-step history.
+        flush()
+            Write the data collected since the last flush to the sink and drop it from memory.
         remove_agent(agent)
             Remove an agent from the model.
-        repopulation()
+        record_trade_stats(stats)
+            Add the price statistics of trades to the accumulators of the current step.
+        repopulation(n=1)
             Repopulate the model with traders.
+        queue_birth()
+            Queue the birth of a new trader.
+        queue_death(agent)
+            Queue the removal of a dead trader.
+        _apply_births_and_deaths()
+            Remove all dead traders and add all new traders of the current step.
+        trader_array(name)
+            Get an attribute of all living traders as an array.
+        snapshot()
+            Get the columnar snapshot of the living traders for the current step.
+        _phased_step()
+            Update all traders in phases.
+        _batched_trade()
+            Resolve the trades of all neighbouring traders at once.
         _update_metabolism_snapshot()
             Update the spice metabolism snapshot for each agent.
         get_average_spice_metabolism_map()
@@ -89,7 +160,13 @@ class SugarScape(Model):
                  tax_scheme: str = "progressive", tax_steps: int = 20, tax_rate: float = 0,
                  distributer_scheme: str = "progressive", distributer_steps: int = 20,
                  repopulate_factor: float = 10, map_scheme: str = "uniform", cell_regeneration: float = 1,
-                 track_scheme: str = "analysis", seed_value: int = None):
+                 track_scheme: str = "analysis", seed_value: int | np.random.SeedSequence = None,
+                 engine: str = "agent",
+                 trade_rows: str = "pair", trade_scheme: str = "sequential", profile: bool = False,
+                 trade_logging: str = "auto", trade_sample_size: int = 100, gini_mode: str = "exact",
+                 segregation_bands: tuple[int, int] = None, collection_period: int = 1,
+                 sink_directory: str = None, flush_every: int = 1000, sink_format: str = "auto",
+                 history_size: int = None, tax_brackets: dict = None):
         """
         Initialize the SugarScape model.
 
@@ -100,7 +177,8 @@ class SugarScape(Model):
             metabolism_mean (float): The mean metabolism for traders.
             vision_mean (float): The mean vision for traders.
             max_age_mean (float): The mean maximum age for traders.
-            tax_scheme (str): The tax scheme to use. Options are "flat", "progressive", "regressive", and "luxury".
+            tax_scheme (str): The tax scheme to use. Options are "flat", "progressive", "regressive", "luxury" and
+                "bracket".
             tax_steps (int): The number of tax steps to use.
             tax_rate (float): The tax rate to apply to all trades.
             distributer_scheme (str): The distributer scheme to use. Options are "flat", "progressive", "needs", and "random".
@@ -108,16 +186,66 @@ class SugarScape(Model):
             repopulate_factor (float): The factor used to determine when to repopulate traders.
             map_scheme (str): The scheme to use for generating the map. Options are "uniform" and "random".
             cell_regeneration (float): The amount of sugar to regenerate in each cell.
-            track_scheme (str): The scheme to use for tracking statistics. Options are "server", "analysis", and "segregation".
-            seed_value (int): The seed value to use for random number generation.
+            track_scheme (str): The scheme to use for tracking statistics. Options are "server", "analysis",
+                "segregation" and "inequality".
+            seed_value (int | numpy.random.SeedSequence): The seed value to use for random number generation. A
+                SeedSequence, for example a child spawned with SeedSequence.spawn for every replicate, can be passed
+                to run independent reproducible models in parallel.
+            engine (str): The engine used to update the traders. Options are "agent" and "vectorized". The "agent"
+                engine steps every trader one after the other, while the "vectorized" engine stores the traders in
+                a TraderPopulation and runs the model in phases, updating metabolism, age and wealth of all traders
+                at once.
+            trade_rows (str): Granularity of the trade log. Options are "pair" and "unit". With "pair" all units
+                exchanged between two traders in a step are summarized in one row, with "unit" every unit exchanged
+                gets its own row.
+            trade_scheme (str): How trades are resolved. Options are "sequential" and "batched". With "sequential"
+                every trader trades with its neighbours when it is activated. With "batched" all neighbouring pairs
+                are matched once per step, shuffled, and resolved in rounds of independent pairs at once. The model
+                then runs in phases, so all traders move before any trader trades.
+            profile (bool): Record the wall time and calls of every phase of a step and the hot path counters in
+                a StepProfiler, available as model.profiler.
+            trade_logging (str): The level of the trade log. Options are "auto", "off", "aggregate", "sample" and
+                "full". With "off" no trades are logged, with "aggregate" only the totals of every step, with "sample"
+                a random sample of trade_sample_size trades per step, and with "full" every trade. With "auto" the
+                most detailed level required by the reporters of the track scheme is used, which is "off" if no
+                reporter reads the trade log. The trade price and count reporters do not need the trade log.
+            trade_sample_size (int): The number of trades sampled per step with the "sample" trade logging level.
+            gini_mode (str): How the Gini coefficient is computed. Options are "exact", "approximate" and "auto".
+                "approximate" uses a fixed-bin histogram instead of sorting the wealth of all traders, and "auto"
+                only does so with more than GINI_EXACT_LIMIT (100k) traders.
+            segregation_bands (tuple[int, int]): The first y coordinate of the middle and the upper region of the grid
+                for the "segregation" track scheme. By default the bands of a 50 high grid (23 and 28) are scaled with
+                the height of the grid.
+            collection_period (int): The number of steps between two collected rows of the data collector.
+            sink_directory (str): Directory to stream the model variables, the per-step counters and the trade log
+                to. Every flush_every steps they are written to disk and dropped from memory, so memory stays bounded
+                on long runs. None keeps all data in memory. run_model writes the last partial chunk, callers that
+                step the model themselves have to call flush() after the last step. Since the flushed steps are no
+                longer in the data collector, a sink cannot be combined with Mesa's batch_run, which reads them.
+            flush_every (int): The number of steps between two flushes to the sink.
+            sink_format (str): The file format of the sink. Options are "parquet", "csv" and "auto", which writes
+                Parquet if pyarrow is installed and CSV otherwise.
+            history_size (int): The number of steps kept in the per-step histories of deaths, births and average
+                wealth. With a size the histories are ring buffers, so memory stays bounded on long runs and on the
+                server. None keeps the history of every step. With a sink it has to be at least flush_every, so no
+                step is dropped before it is written.
+            tax_brackets (dict): The keyword arguments of the BracketTaxer used by the "bracket" tax scheme, such as
+                {"multipliers": (0.5, 1, 2), "cut_points": (0.5, 0.9)}.
         """
 
         # Initialize model
         super().__init__()
 
+        # Set profiler
+        self.profiler = StepProfiler(enabled=profile)
+
         # Set seed for reproducibility
-        if seed_value:
-            random.seed(seed_value)
+        if isinstance(seed_value, np.random.SeedSequence):
+            self.seed_sequence = seed_value
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed_value)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.reset_randomizer(int(self.rng.integers(2 ** 63)))
 
         # Set parameters
         self.height = height
@@ -143,6 +271,8 @@ class SugarScape(Model):
             self.taxer = RegressiveTaxer(tax_steps, tax_rate)
         elif tax_scheme == "luxury":
             self.taxer = LuxuryTaxer(tax_steps, tax_rate)
+        elif tax_scheme == "bracket":
+            self.taxer = BracketTaxer(tax_steps, tax_rate, **(tax_brackets or {}))
         else:
             raise ValueError("Invalid tax scheme")
 
@@ -154,37 +284,100 @@ class SugarScape(Model):
         elif distributer_scheme == "needs":
             self.distributer = NeedsBasedDistributer(distributer_steps)
         elif distributer_scheme == "random":
-            self.distributer = RandomDistributer(distributer_steps)
+            self.distributer = RandomDistributer(distributer_steps, self.rng)
         else:
             raise ValueError("Invalid distributer scheme")
 
         # Set repopulation factor
         self.repopulate_factor = repopulate_factor
 
+        # Set engine
+        if engine == "agent":
+            self.population = None
+            self.trader_class = Trader
+        elif engine == "vectorized":
+            self.population = TraderPopulation(initial_population)
+            self.trader_class = PopulationTrader
+        else:
+            raise ValueError("Invalid engine")
+        self.engine = engine
+
+        # Set trade log granularity
+        if trade_rows not in ("pair", "unit"):
+            raise ValueError("Invalid trade rows")
+        self.trade_rows = trade_rows
+
+        # Set trade scheme
+        if trade_scheme not in ("sequential", "batched"):
+            raise ValueError("Invalid trade scheme")
+        self.trade_scheme = trade_scheme
+
+        # Set trade logging
+        if trade_logging != "auto" and trade_logging not in TradeLog.MODES:
+            raise ValueError("Invalid trade logging")
+        self.trade_logging = trade_logging
+        self.trade_sample_size = trade_sample_size
+
+        # Set Gini mode
+        if gini_mode not in ("exact", "approximate", "auto"):
+            raise ValueError("Invalid gini mode")
+        self.gini_mode = gini_mode
+
+        # Set segregation bands
+        if segregation_bands is not None and not 0 <= segregation_bands[0] <= segregation_bands[1]:
+            raise ValueError("Invalid segregation bands")
+        self.segregation_bands = segregation_bands
+
+        # Set collection period
+        if collection_period < 1:
+            raise ValueError("Invalid collection period")
+        self.collection_period = collection_period
+
+        # Set result sink
+        if flush_every < 1:
+            raise ValueError("Invalid flush interval")
+        self.sink = ResultSink(sink_directory, sink_format) if sink_directory is not None else None
+        self.flush_every = flush_every
+
+        # Set history size, the sink reads the histories so they have to hold every step between two flushes
+        if history_size is not None and history_size < 1:
+            raise ValueError("Invalid history size")
+        if history_size is not None and self.sink is not None and history_size < flush_every:
+            raise ValueError("History size smaller than the flush interval of the sink")
+        self.history_size = history_size
+
         # Create grid and schedule
         self.schedule = RandomActivationByType(self)
-        self.grid = MultiGrid(self.height, self.width, False)
+        self.grid = TraderGrid(self.height, self.width, False)
 
         # Initialize counters and lists used for data collection
-        self.deaths_age = []
-        self.deaths_starved = []
+        self.deaths_age = self._history(int)
+        self.deaths_starved = self._history(int)
         self.deaths_age_step = 0
         self.deaths_starved_step = 0
-        self.reproduced = []
+        self.reproduced = self._history(int)
         self.reproduced_step = 0
-        self.averagewealth = []
-        self.wealth_step = []
+        self.averagewealth = self._history()
+        self.wealth_step = RunningMean()
+        self.trade_count_step = 0
+        self.trade_log_price_sum_step = 0.0
+        self.trade_log_price_squares_step = 0.0
 
-        # Create grid cells
+        # Create resource field
         self.last_id = 0
         grid_creator = GridCreator(self, map_scheme, cell_regeneration=self.cell_regeneration)
-        grid_creator.create_grid()
+        self.resource_field = grid_creator.create_grid()
 
         # Create traders
         self.traders = {}
-        for i in range(self.initial_population):
-            self.repopulation()
-
+        self.birth_queue = 0
+        self.death_queue = []
+        self.repopulation(self.initial_population)
+
+        self.trade_log = None
+        self.ranking = None
+        self.trader_snapshot = None
+        self.wealth_sketch = None
         self.datacollector = None
         self.tracker(track_scheme)
 
@@ -204,28 +397,61 @@ class SugarScape(Model):
         self.deaths_age_step = 0
         self.deaths_starved_step = 0
         self.reproduced_step = 0
-        self.wealth_step = []
-        self.reproduced_step = 0
-        self.wealth_step = []
-
-        # Update cells and traders
-        self.schedule.step()
-
-        # Add to lists
-        self.deaths_age.append(self.deaths_age_step)
-        self.deaths_starved.append(self.deaths_starved_step)
-        self.reproduced.append(self.reproduced_step)
-        self.averagewealth.append(np.mean(self.wealth_step))
-
-        # Take step for taxer and distributer
-        if self.tax_rate > 0:
-            self.taxer.step(self.traders.values())
-            self.distributer.step(self.traders.values(), self.taxer)
-
-        # Collect data
-        self.datacollector.collect(self)
-        self.running = True if self.schedule.get_agent_count() > 0 else False
-        self._update_metabolism_snapshot()
+        self.wealth_step.reset()
+        self.trade_count_step = 0
+        self.trade_log_price_sum_step = 0.0
+        self.trade_log_price_squares_step = 0.0
+        profiler = self.profiler
+        profiler.start_step(self.current_step)
+
+        with profiler.phase("step"):
+            # Regenerate cells
+            with profiler.phase("regeneration"):
+                self.resource_field.regenerate()
+
+            # Update traders
+            if self.engine == "vectorized" or self.trade_scheme == "batched":
+                self._phased_step()
+            else:
+                self.schedule.step()
+
+            # Apply births and deaths
+            with profiler.phase("births_deaths"):
+                self._apply_births_and_deaths()
+
+            # Add to lists
+            self.deaths_age.append(self.deaths_age_step)
+            self.deaths_starved.append(self.deaths_starved_step)
+            self.reproduced.append(self.reproduced_step)
+            self.averagewealth.append(self.wealth_step.mean())
+
+            # Take step for taxer and distributer
+            if self.tax_rate > 0:
+                # Holdings and wealth rankings shared by the taxer and the distributer
+                self.ranking = RankingCache(self.traders.values())
+                with profiler.phase("tax"):
+                    self.taxer.step(self.traders.values(), self.ranking)
+                with profiler.phase("distribute"):
+                    self.distributer.step(self.traders.values(), self.taxer, self.ranking)
+                self.ranking = None
+
+            # Collect data
+            with profiler.phase("collect"):
+                self.trade_log.end_step(self.current_step)
+                self.trader_snapshot = None
+                self.datacollector.collect(self)
+                if self.wealth_sketch is not None:
+                    self.wealth_sketch.update(self.snapshot().wealth)
+            self.running = True if self.schedule.get_agent_count() > 0 else False
+            with profiler.phase("metabolism_snapshot"):
+                self._update_metabolism_snapshot()
+
+            # Stream data to disk
+            if self.sink is not None and (self.current_step % self.flush_every == 0 or not self.running):
+                with profiler.phase("flush"):
+                    self.flush()
+
+        profiler.end_step()
 
     def run_model(self, step_count: int = 200) -> None:
         """
@@ -241,14 +467,64 @@ class SugarScape(Model):
         for i in range(step_count):
             self.step()
 
+        # Write the last partial chunk
+        self.flush()
+
     def get_trade_log(self) -> pd.DataFrame:
         """
-        Get the trade log from the data collector.
+        Get the trade log as a DataFrame. The DataFrame is a view on the columns of the trade log, copy it if it is
+        kept while the model keeps running.
 
         Returns:
             pd.DataFrame: A pandas DataFrame containing the trade log.
         """
-        return self.datacollector.get_table_dataframe("Trades")
+        return self.trade_log.to_dataframe()
+
+    def _history(self, dtype: type = float) -> list | RingBuffer:
+        """
+        Create a per-step history, a ring buffer of history_size steps if it is set and a list otherwise.
+
+        Args:
+            dtype (type): Type of the values in the ring buffer, int for counters
+
+        Returns:
+            list | RingBuffer: An empty history
+        """
+        if self.history_size is None:
+            return []
+        return RingBuffer(self.history_size, dtype)
+
+    def flush(self) -> None:
+        """
+        Write the model variables, the per-step counters and the trade log collected since the last flush to the sink,
+        as the "model", "history" and "trades" tables, and drop them from memory. The model flushes every flush_every
+        steps and when it stops running, so callers that step the model themselves should call flush() after the last
+        step to write the last partial chunk. Does nothing without a sink.
+
+        Returns:
+            None
+
+        """
+        if self.sink is None:
+            return
+
+        self.sink.write("model", self.datacollector.drain())
+        self.sink.write("trades", self.trade_log.drain())
+
+        # The counters are appended once per step, up to the current step
+        first_step = self.current_step - len(self.deaths_age) + 1
+        history = pd.DataFrame({
+            "Step": np.arange(first_step, self.current_step + 1),
+            "Deaths by Age": list(self.deaths_age),
+            "Deaths by Hunger": list(self.deaths_starved),
+            "Reproduced": list(self.reproduced),
+            "Average Wealth": list(self.averagewealth),
+        })
+        self.sink.write("history", history)
+        self.deaths_age.clear()
+        self.deaths_starved.clear()
+        self.reproduced.clear()
+        self.averagewealth.clear()
 
     def remove_agent(self, agent: Trader) -> None:
         """
@@ -265,54 +541,312 @@ class SugarScape(Model):
         self.schedule.remove(agent)
         del self.traders[agent.unique_id]
 
-    def repopulation(self) -> None:
+        # Free slot in the population
+        if self.population is not None:
+            self.population.remove(agent.slot)
+
+    def record_trade_stats(self, stats: tuple[int, float, float]) -> None:
+        """
+        Add the price statistics of trades to the running accumulators of the current step, so the trade reporters
+        do not need to go through the trade log.
+
+        Args:
+            stats (tuple[int, float, float]): The number of units traded, and the sum and the sum of squares of the
+                log of their trade prices.
+
+        Returns:
+            None
+        """
+        units, log_price_sum, log_price_squares = stats
+        self.trade_count_step += units
+        self.trade_log_price_sum_step += log_price_sum
+        self.trade_log_price_squares_step += log_price_squares
+
+    def repopulation(self, n: int = 1) -> None:
         """
-        Repopulate the model with traders.
+        Repopulate the model with traders. The positions and parameters of all new traders are drawn at once.
+
+        Args:
+            n (int): The number of traders to add.
 
         Returns:
             None
         """
-        # Random position
-        x = random.randint(0, self.width - 1)
-        y = random.randint(0, self.height - 1)
+        if n <= 0:
+            return
+
+        # Random positions
+        x = self.rng.integers(0, self.width - 1, n).tolist()
+        y = self.rng.integers(0, self.height - 1, n).tolist()
 
         # Instantiate trader parameters
-        sugar, spice = np.random.randint(10, 20, 2)
-        sugar_metabolism, spice_metabolism = np.maximum(1, np.random.poisson(self.metabolism_mean, 2))
-        vision = max(1, np.random.poisson(self.vision_mean))
-        max_age = max(1, np.random.poisson(self.max_age_mean))
+        sugar, spice = self.rng.integers(10, 20, (2, n)).tolist()
+        sugar_metabolism, spice_metabolism = np.maximum(1, self.rng.poisson(self.metabolism_mean, (2, n))).tolist()
+        vision = np.maximum(1, self.rng.poisson(self.vision_mean, n)).tolist()
+        max_age = np.maximum(1, self.rng.poisson(self.max_age_mean, n)).tolist()
 
-        # Update last id
-        self.last_id += 1
+        for i in range(n):
+            # Update last id
+            self.last_id += 1
 
-        # Instantiate trader
-        trader = Trader(self.last_id, self, sugar, sugar_metabolism, spice, spice_metabolism, vision, max_age)
+            # Instantiate trader
+            trader = self.trader_class(self.last_id, self, sugar[i], sugar_metabolism[i], spice[i],
+                                       spice_metabolism[i], vision[i], max_age[i])
 
-        # Place trader on grid
-        self.grid.place_agent(trader, (x, y))
-        self.schedule.add(trader)
+            # Place trader on grid
+            self.grid.place_agent(trader, (x[i], y[i]))
+            self.schedule.add(trader)
 
-        # Add trader to dictionary
-        self.traders[self.last_id] = trader
+            # Add trader to dictionary
+            self.traders[self.last_id] = trader
 
         # Increment reproduction counter
-        self.reproduced_step += 1
+        self.reproduced_step += n
+
+    def queue_birth(self) -> None:
+        """
+        Queue the birth of a new trader, which is added at the end of the current step.
+
+        Returns:
+            None
+        """
+        self.birth_queue += 1
+
+    def queue_death(self, agent: Trader) -> None:
+        """
+        Queue the removal of a dead trader. The trader stays on the grid until the end of the current step, but no
+        longer trades.
+
+        Args:
+            agent (Trader): The trader that died.
+
+        Returns:
+            None
+        """
+        self.death_queue.append(agent)
+
+    def _apply_births_and_deaths(self) -> None:
+        """
+        Remove all traders that died in the current step and add all traders that were born in it, so the grid,
+        schedule and traders are not changed while the traders are being stepped.
+
+        Returns:
+            None
+        """
+        # Remove dead traders
+        for agent in self.death_queue:
+            self.remove_agent(agent)
+        self.death_queue = []
+
+        # Add new traders
+        births, self.birth_queue = self.birth_queue, 0
+        self.repopulation(births)
+
+    def _phased_step(self) -> None:
+        """
+        Update all traders in phases. Moving and picking up are done trader by trader in a random order, after which
+        all traders update their wealth and trade. With the "vectorized" engine, reproduction, metabolism and aging
+        are done for all traders at once on the columns of the trader population, with the "agent" engine they are
+        done trader by trader. Births and deaths are queued and applied at the end of the step.
+
+        Returns:
+            None
+
+        """
+        profiler = self.profiler
+
+        # Random activation order
+        traders = list(self.traders.values())
+        self.random.shuffle(traders)
+
+        # Move and pick up sugar and spice
+        for trader in traders:
+            with profiler.phase("move"):
+                trader.move()
+            with profiler.phase("pick_up"):
+                trader.pick_up()
+
+        # Update wealth
+        with profiler.phase("update_wealth"):
+            if self.population is not None:
+                self.population.update_wealth()
+                self.wealth_step.extend(self.population.column("wealth"))
+            else:
+                for trader in traders:
+                    trader.update_wealth()
+
+        # Trade sugar and spice
+        with profiler.phase("trade"):
+            if self.trade_scheme == "batched":
+                self._batched_trade()
+            else:
+                for trader in traders:
+                    trader.trade()
+
+        # Reproduce, metabolize and age trader by trader
+        if self.population is None:
+            for trader in traders:
+                with profiler.phase("repopulate"):
+                    trader.repopulate()
+                with profiler.phase("metabolize"):
+                    trader.metabolize()
+                with profiler.phase("age"):
+                    trader.age_increase()
+                if trader.has_died:
+                    self.queue_death(trader)
+
+            # Update schedule counters
+            self.schedule.steps += 1
+            self.schedule.time += 1
+            return
+
+        # Reproduction
+        with profiler.phase("repopulate"):
+            self.birth_queue += self.population.repopulate(self.repopulate_factor)
+
+        # Metabolize sugar and spice, and increment age
+        with profiler.phase("metabolize"):
+            starved = self.population.metabolize()
+        with profiler.phase("age"):
+            aged = self.population.age_increase()
+        self.deaths_starved_step += int(np.count_nonzero(starved))
+        self.deaths_age_step += int(np.count_nonzero(aged))
+
+        # Queue dead traders
+        for unique_id in self.population.unique_id[:self.population.size][starved | aged].tolist():
+            trader = self.traders[unique_id]
+            trader.has_died = True
+            self.queue_death(trader)
+
+        # Update schedule counters
+        self.schedule.steps += 1
+        self.schedule.time += 1
+
+    def _batched_trade(self) -> None:
+        """
+        Resolve the trades of all neighbouring traders at once. The list of neighbouring pairs is built once from the
+        occupancy of the grid, shuffled and oriented with a single random permutation, and resolved in rounds of pairs
+        that do not share a trader. The result is the same as letting every pair trade one after the other in the
+        shuffled order.
+
+        Returns:
+            None
+
+        """
+        # Gather the state of all traders
+        if self.population is not None:
+            slots = self.population.active()
+            state = {name: getattr(self.population, name)[slots] for name in
+                     ("unique_id", "sugar", "spice", "sugar_metabolism", "spice_metabolism", "wealth", "x", "y")}
+        else:
+            traders = list(self.traders.values())
+            state = {name: self.trader_array(name) for name in
+                     ("unique_id", "sugar", "spice", "sugar_metabolism", "spice_metabolism", "wealth", "x", "y")}
+        sugar_weight = state["sugar_metabolism"] / (state["sugar_metabolism"] + state["spice_metabolism"])
+        spice_weight = 1 - sugar_weight
+
+        # Neighbouring pairs
+        first, second = adjacent_pairs(state["x"], state["y"], self.grid.width, self.grid.height,
+                                       self.grid.occupancy)
+        n_pairs = len(first)
+        self.profiler.count("trade_pairs", n_pairs)
+        if n_pairs == 0:
+            return
+
+        # Shuffle pairs and pick the initiator of every pair with one permutation of both orientations
+        permutation = self.rng.permutation(2 * n_pairs)
+        pairs, positions = np.unique(permutation % n_pairs, return_index=True)
+        order = np.argsort(positions)
+        swap = permutation[positions[order]] >= n_pairs
+        pairs = pairs[order]
+        first, second = np.where(swap, second[pairs], first[pairs]), np.where(swap, first[pairs], second[pairs])
+
+        # Resolve trades
+        sugar, spice = state["sugar"].astype(float), state["spice"].astype(float)
+        pair, first_is_high, trade_sugar, trade_spice, trade_price, units, stats = batched_trade(
+            first, second, sugar, spice, state["sugar_metabolism"], state["spice_metabolism"], state["wealth"],
+            sugar_weight, spice_weight, per_unit=self.trade_rows == "unit"
+        )
+
+        self.record_trade_stats(stats)
+
+        # Every pair runs one iteration per unit exchanged and one that ends the trade
+        self.profiler.count("trade_iterations", int(units.sum()) + n_pairs)
+        self.profiler.count("trade_rows", len(pair))
+
+        # No trade took place
+        if len(pair) == 0:
+            return
+
+        # Update goods of the traders that traded
+        traded = np.unique(np.concatenate((first[pair], second[pair])))
+        if self.population is not None:
+            self.population.sugar[slots[traded]] = sugar[traded]
+            self.population.spice[slots[traded]] = spice[traded]
+        else:
+            for index in traded.tolist():
+                traders[index].sugar = float(sugar[index])
+                traders[index].spice = float(spice[index])
+
+        # Update trade log
+        if not self.trade_log.enabled:
+            return
+        unique_id = state["unique_id"].astype(np.int64)
+        high = np.where(first_is_high, unique_id[first[pair]], unique_id[second[pair]])
+        low = np.where(first_is_high, unique_id[second[pair]], unique_id[first[pair]])
+        self.trade_log.extend(self.current_step, high, low, trade_sugar, trade_spice, trade_price, units)
+
+    def trader_array(self, name: str) -> np.ndarray:
+        """
+        Get an attribute of all living traders as an array. The "vectorized" engine reads the column of the trader
+        population directly, while the "agent" engine gathers the attribute from every trader. The coordinates of the
+        traders can be requested with "x" and "y".
+
+        Args:
+            name (str): Name of the attribute
+
+        Returns:
+            numpy.ndarray: The attribute of all living traders
+        """
+        if self.population is not None:
+            return self.population.column(name)
+
+        traders = self.traders.values()
+        if name == "x":
+            values = (trader.pos[0] for trader in traders)
+        elif name == "y":
+            values = (trader.pos[1] for trader in traders)
+        else:
+            values = (getattr(trader, name) for trader in traders)
+
+        return np.fromiter(values, dtype=float, count=len(self.traders))
+
+    def snapshot(self) -> TraderSnapshot:
+        """
+        Get the columnar snapshot of the living traders for the current step. The snapshot is taken once when the data
+        is collected and shared by all reporters, and retaken if it is requested in a later step.
+
+        Returns:
+            TraderSnapshot: The snapshot of the living traders
+        """
+        if self.trader_snapshot is None or self.trader_snapshot.step != self.current_step:
+            self.trader_snapshot = TraderSnapshot.from_model(self)
+        return self.trader_snapshot
 
     def _update_metabolism_snapshot(self) -> None:
         """
-        Update the spice metabolism snapshot for each agent. This method iterates over all agents in the schedule. If
-        the agent is a Trader, it updates the spice metabolism snapshot by adding the agent's spice metabolism to the
+        Update the spice metabolism snapshot for each agent. It adds the spice metabolism of every trader to the
         corresponding position in the snapshot and increments the count of agents at that position.
 
         Returns:
             None
 
         """
-        for agent in self.schedule.agents:
-            if isinstance(agent, Trader):
-                x, y = agent.pos
-                self.spice_metabolism_snapshot[x, y, 0] += agent.spice_metabolism
-                self.spice_metabolism_snapshot[x, y, 1] += 1
+        snapshot = self.snapshot()
+        x = snapshot.x.astype(int)
+        y = snapshot.y.astype(int)
+        np.add.at(self.spice_metabolism_snapshot[:, :, 0], (x, y), snapshot.spice_metabolism)
+        np.add.at(self.spice_metabolism_snapshot[:, :, 1], (x, y), 1)
 
     def get_average_spice_metabolism_map(self) -> np.ndarray:
         """
@@ -333,10 +867,13 @@ class SugarScape(Model):
 
     def tracker(self, track_scheme: str = "analysis") -> None:
         """
-        Set up the data collector and statistics to track.
+        Set up the data collector, statistics to track and the trade log. A reporter that reads the trade log declares
+        the level it needs with a trade_logging attribute, for example compute_x.trade_logging = "full", which is used
+        when the trade logging level is chosen automatically.
 
         Args: track_scheme (str): The scheme to use for tracking statistics. Options are "server", "analysis",
-        and "segregation".
+        "segregation" and "inequality". The "inequality" scheme also keeps a quantile sketch of the wealth of every
+        trader over the whole run.
 
         Returns:
             None
@@ -377,15 +914,25 @@ class SugarScape(Model):
                 "Middle Vision": compute_middle_vision,
                 "Upper Vision": compute_upper_vision,
             }
+        elif track_scheme == "inequality":
+            model_reporters = {
+                **inequality_reporters(),
+                "Trader Count": lambda m: len(m.traders),
+            }
+
+            # Sketch of the wealth over the whole run, with its own random stream
+            self.wealth_sketch = QuantileSketch(rng=np.random.default_rng(self.seed_sequence.spawn(1)[0]))
         else:
             raise ValueError("Invalid track scheme")
 
-        # Instantiate table
-        table = {"Trades":
-                     ["Step", "TraderHighMRS_ID", "TraderLowMRS_ID", "TradeSugar", "TradeSpice", "TradePrice"]
-                 }
-
-        # Set data collector
-        self.datacollector = DataCollector(
-            model_reporters=model_reporters,
-            tables=table)
+        # Set trade log, with the most detailed level any reporter needs if it is chosen automatically
+        trade_logging = self.trade_logging
+        if trade_logging == "auto":
+            levels = [getattr(reporter, "trade_logging", "off") for reporter in model_reporters.values()]
+            trade_logging = max(levels, key=TradeLog.MODES.index, default="off")
+        # The reservoir sample has its own random stream, so the logging level does not change the simulation
+        self.trade_log = TradeLog(trade_logging, self.trade_sample_size,
+                                  np.random.default_rng(self.seed_sequence.spawn(1)[0]))
+
+        # Set data collector, trades are logged in the trade log
+        self.datacollector = ModelCollector(model_reporters, collection_period=self.collection_period)
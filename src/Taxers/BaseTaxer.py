@@ -1,25 +1,41 @@
-from src.Agents.Trader import Trader
+import numpy as np
+
+from src.Holdings import Holdings
+from src.RankingCache import RankingCache
 
 
 class BaseTaxer:
     """
     Base class for all taxers. It defines the interface for taxers, and provides a basic implementation of the step method.
-    Every other taxer should inherit from this class and implement the collect_taxes method with only one argument: traders.
+    Taxes are computed on arrays of the holdings of all traders: tax_rates gives the tax rate of every trader, and
+    compute_taxes the sugar and spice tax. Every other taxer should inherit from this class and override tax_rates,
+    compute_taxes, or the collect_taxes method with the traders and an optional RankingCache shared with the
+    distributer.
 
     Attributes:
         tax_steps (int): Number of steps between each tax collection
         tax_rate (float): Tax rate
         taxes_collection (dict): Dictionary to store the collected taxes
         current_step (int): Current step number
+        truncate (bool): Whether taxes are truncated to whole units
 
     Methods:
-        step(traders):
+        step(traders, ranking=None):
             Collects taxes from the traders every tax_steps steps
-        collect_taxes(traders):
+        collect_taxes(traders, ranking=None):
             Collects taxes from the traders
+        tax_rates(wealth):
+            Computes the tax rate of every trader
+        compute_taxes(holdings, rates):
+            Computes the sugar and spice tax of every trader
+        apply_taxes(holdings, sugar_tax, spice_tax):
+            Subtracts the taxes from the traders and adds them to the taxes collection
         reset_tax():
             Resets the taxes collection
     """
+    # Taxes are truncated to whole units
+    truncate = True
+
     def __init__(self, tax_steps: int, tax_rate: float):
         """
         Constructor for BaseTaxer.
@@ -34,44 +50,99 @@ class BaseTaxer:
         self.taxes_collection = {"sugar": 0, "spice": 0}
         self.current_step = 0
 
-    def step(self, agents: dict) -> None:
+    def step(self, agents: dict, ranking: RankingCache = None) -> None:
         """
         Take step in the taxer. Collects taxes from the traders every tax_steps steps.
 
         Args:
             agents (dict): Dictionary of agents
+            ranking (RankingCache): Holdings and rankings of the agents shared with the distributer
 
         Returns:
             None
         """
         self.current_step += 1
         if self.current_step % self.tax_steps == 0:
-            self.collect_taxes(agents)
+            self.collect_taxes(agents, ranking)
 
-    def collect_taxes(self, agents: dict) -> None:
+    def collect_taxes(self, agents: dict, ranking: RankingCache = None) -> None:
         """
-        Collects taxes from the traders. This method should be implemented by the child classes.
+        Collects taxes from the traders. Gathers the holdings of all traders (or takes them from the ranking cache),
+        computes their tax rates and taxes, and subtracts the taxes.
 
         Args:
             agents (dict): Dictionary of agents
+            ranking (RankingCache): Holdings and rankings of the agents shared with the distributer
+
+        Returns:
+            None
+        """
+        holdings = ranking.holdings if ranking is not None else Holdings(agents)
+        if len(holdings) == 0:
+            return
+
+        rates = self.tax_rates(holdings["wealth"])
+        sugar_tax, spice_tax = self.compute_taxes(holdings, rates)
+        self.apply_taxes(holdings, sugar_tax, spice_tax)
+
+    def tax_rates(self, wealth: np.ndarray) -> np.ndarray:
+        """
+        Computes the tax rate of every trader, the same rate for everyone.
+
+        Args:
+            wealth (numpy.ndarray): Wealth of every trader
+
+        Returns:
+            numpy.ndarray: Tax rate of every trader
+        """
+        return np.full(len(wealth), self.tax_rate)
+
+    def compute_taxes(self, holdings: Holdings, rates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the sugar and spice tax of every trader, as the tax rate times the sugar and spice exceeding the
+        metabolism. The taxes are truncated to whole units if truncate is set.
+
+        Args:
+            holdings (Holdings): Holdings of all traders
+            rates (numpy.ndarray): Tax rate of every trader
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Sugar and spice tax of every trader
+        """
+        # Compute excessive sugar and spice
+        excessive_sugar = np.maximum(0, holdings["sugar"] - holdings["sugar_metabolism"])
+        excessive_spice = np.maximum(0, holdings["spice"] - holdings["spice_metabolism"])
+
+        # Compute tax
+        sugar_tax = rates * excessive_sugar
+        spice_tax = rates * excessive_spice
+        if self.truncate:
+            sugar_tax, spice_tax = np.trunc(sugar_tax), np.trunc(spice_tax)
+
+        return sugar_tax, spice_tax
+
+    def apply_taxes(self, holdings: Holdings, sugar_tax: np.ndarray, spice_tax: np.ndarray) -> None:
+        """
+        Subtracts the taxes from the traders and adds them to the taxes collection. Only traders that pay a tax are
+        written back.
+
+        Args:
+            holdings (Holdings): Holdings of all traders
+            sugar_tax (numpy.ndarray): Sugar tax of every trader
+            spice_tax (numpy.ndarray): Spice tax of every trader
 
         Returns:
             None
         """
-        for agent in agents:
-            # Compute excessive sugar and spice
-            excessive_sugar = max(0, agent.sugar - agent.sugar_metabolism)
-            excessive_spice = max(0, agent.spice - agent.spice_metabolism)
-
-            # Compute tax
-            sugar_tax = int(self.tax_rate * excessive_sugar)
-            spice_tax = int(self.tax_rate * excessive_spice)
-
-            # Update agent's goods and taxes collection
-            agent.sugar -= sugar_tax
-            agent.spice -= spice_tax
-            self.taxes_collection["sugar"] += sugar_tax
-            self.taxes_collection["spice"] += spice_tax
+        for resource, tax in (("sugar", sugar_tax), ("spice", spice_tax)):
+            holdings.write(resource, holdings[resource] - tax, mask=tax != 0)
+
+            # Truncated taxes are collected as whole units, other taxes are added one by one like a running total
+            if self.truncate:
+                self.taxes_collection[resource] += int(tax.sum())
+            else:
+                running_total = np.cumsum(np.append(self.taxes_collection[resource], tax))
+                self.taxes_collection[resource] = float(running_total[-1])
 
     def reset_tax(self) -> None:
         """
@@ -0,0 +1,122 @@
+from fractions import Fraction
+
+import numpy as np
+
+from .BaseTaxer import BaseTaxer
+from src.Holdings import Holdings
+
+
+class BracketTaxer(BaseTaxer):
+    """
+    Taxer with an arbitrary number of wealth brackets, each taxed at tax_rate times its own multiplier. The brackets
+    are bounded either by cut points, fractions of the population sorted by wealth, or by absolute wealth thresholds.
+    The schedule is compiled into arrays once, and applied to all traders with one np.partition (for cut points), one
+    np.digitize and one lookup of the rates.
+
+    With cut points, the threshold of a cut point c is the wealth of the trader at position int(n * c) of the sorted
+    wealth of the n traders. Cut points can be given as a Fraction to get exact positions, e.g. Fraction(1, 3) gives
+    n // 3.
+
+    Attributes:
+        multipliers (numpy.ndarray): Tax rate multiplier of every bracket, from low to high wealth
+        rates (numpy.ndarray): Tax rate of every bracket
+        cut_points (tuple): Cut points between the brackets as fractions of the population, None if thresholds are used
+        thresholds (numpy.ndarray): Wealth thresholds between the brackets, None if cut points are used
+        right (bool): Whether a trader with a wealth equal to a threshold falls in the lower bracket
+        base (str): What is taxed, either "excess" (sugar and spice exceeding the metabolism) or "total"
+
+    Methods:
+        brackets(wealth):
+            Computes the bracket of every trader
+    """
+    BASES = ("excess", "total")
+
+    def __init__(self, tax_steps: int, tax_rate: float, multipliers: tuple[float, ...] = (1,),
+                 cut_points: tuple[float | Fraction, ...] = None, thresholds: tuple[float, ...] = None,
+                 right: bool = False, base: str = "excess", truncate: bool = True):
+        """
+        Constructor for BracketTaxer.
+
+        Args:
+            tax_steps (int): Number of steps between each tax collection
+            tax_rate (float): Tax rate
+            multipliers (tuple[float, ...]): Tax rate multiplier of every bracket, from low to high wealth
+            cut_points (tuple[float | Fraction, ...]): Increasing fractions of the population between the brackets
+            thresholds (tuple[float, ...]): Increasing wealth thresholds between the brackets, instead of cut points
+            right (bool): Whether a trader with a wealth equal to a threshold falls in the lower bracket
+            base (str): What is taxed, either "excess" (sugar and spice exceeding the metabolism) or "total"
+            truncate (bool): Whether taxes are truncated to whole units
+        """
+        super().__init__(tax_steps, tax_rate)
+        if cut_points is not None and thresholds is not None:
+            raise ValueError("Give either cut points or thresholds")
+        bounds = cut_points if cut_points is not None else thresholds if thresholds is not None else ()
+        if len(multipliers) != len(bounds) + 1:
+            raise ValueError("Invalid number of multipliers")
+        if list(bounds) != sorted(bounds):
+            raise ValueError("Invalid bracket bounds")
+        if cut_points is not None and not all(0 <= cut_point <= 1 for cut_point in cut_points):
+            raise ValueError("Invalid cut points")
+        if base not in self.BASES:
+            raise ValueError("Invalid tax base")
+
+        # Compile the schedule
+        self.multipliers = np.asarray(multipliers, dtype=float)
+        self.rates = np.array([tax_rate * multiplier for multiplier in multipliers])
+        self.cut_points = tuple(cut_points) if cut_points is not None else None
+        self.thresholds = np.asarray(thresholds, dtype=float) if thresholds is not None else None
+        self.right = right
+        self.base = base
+        self.truncate = truncate
+
+    def brackets(self, wealth: np.ndarray) -> np.ndarray:
+        """
+        Computes the bracket of every trader. The thresholds of cut points are found with np.partition, without
+        sorting the wealth.
+
+        Args:
+            wealth (numpy.ndarray): Wealth of every trader
+
+        Returns:
+            numpy.ndarray: Bracket of every trader, 0 for the lowest
+        """
+        if not self.cut_points:
+            thresholds = self.thresholds if self.thresholds is not None else np.zeros(0)
+        else:
+            n = len(wealth)
+            indices = [min(int(n * cut_point), n - 1) for cut_point in self.cut_points]
+            thresholds = np.partition(wealth, indices)[indices]
+
+        return np.digitize(wealth, thresholds, right=self.right)
+
+    def tax_rates(self, wealth: np.ndarray) -> np.ndarray:
+        """
+        Computes the tax rate of every trader from their bracket.
+
+        Args:
+            wealth (numpy.ndarray): Wealth of every trader
+
+        Returns:
+            numpy.ndarray: Tax rate of every trader
+        """
+        return self.rates[self.brackets(wealth)]
+
+    def compute_taxes(self, holdings: Holdings, rates: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the sugar and spice tax of every trader, as the tax rate times the excess or the total sugar and
+        spice, truncated to whole units if truncate is set.
+
+        Args:
+            holdings (Holdings): Holdings of all traders
+            rates (numpy.ndarray): Tax rate of every trader
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: Sugar and spice tax of every trader
+        """
+        if self.base == "excess":
+            return super().compute_taxes(holdings, rates)
+
+        sugar_tax, spice_tax = holdings["sugar"] * rates, holdings["spice"] * rates
+        if self.truncate:
+            sugar_tax, spice_tax = np.trunc(sugar_tax), np.trunc(spice_tax)
+        return sugar_tax, spice_tax
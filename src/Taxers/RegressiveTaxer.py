@@ -1,8 +1,9 @@
-from .BaseTaxer import BaseTaxer
-from src.Agents.Trader import Trader
+from fractions import Fraction
 
+from .BracketTaxer import BracketTaxer
 
-class RegressiveTaxer(BaseTaxer):
+
+class RegressiveTaxer(BracketTaxer):
     """
     Apply a regressive tax system to the agents. This taxer collects taxes from the traders using a regressive tax
     system. Agents are divided into three classes based on their wealth. The following classes are defined:
@@ -15,47 +16,15 @@ class RegressiveTaxer(BaseTaxer):
         - Middle class: tax_rate
         - High class: tax_rate * 0.66
 
+    Unlike the other taxers, the tax is taken from the total sugar and spice of the traders.
     """
-    def collect_taxes(self, agents: dict) -> None:
-        """
-        Collects taxes from the traders using a regressive tax system.
-        Args:
-            agents (dict): Dictionary of agents
-
-        Returns:
-            None
-        """
-        # Get wealth distribution to determine tax rates
-        wealths = [agent.wealth for agent in agents]
-
-        # Sort wealth
-        wealths.sort()
-
-        # Find 33rd and 66th percentiles
-        low_class = wealths[len(wealths) // 3]
-        middle_class = wealths[2 * len(wealths) // 3]
-
-        # Collect taxes
-        for agent in agents:
-            if agent.wealth < low_class:
-                self.update_goods(agent, self.tax_rate * 1.33)
-            elif agent.wealth < middle_class:
-                self.update_goods(agent, self.tax_rate)
-            else:
-                self.update_goods(agent, self.tax_rate * 0.66)
-
-    def update_goods(self, agent: Trader, tax_rate: float) -> None:
+    def __init__(self, tax_steps: int, tax_rate: float):
         """
-        Updates the agent's goods and taxes collection.
+        Constructor for RegressiveTaxer.
 
         Args:
-            agent (Trader): Agent
+            tax_steps (int): Number of steps between each tax collection
             tax_rate (float): Tax rate
-
-        Returns:
-            None
         """
-        self.taxes_collection["sugar"] += int(agent.sugar * tax_rate)
-        self.taxes_collection["spice"] += int(agent.spice * tax_rate)
-        agent.sugar -= int(agent.sugar * tax_rate)
-        agent.spice -= int(agent.spice * tax_rate)
+        super().__init__(tax_steps, tax_rate, multipliers=(1.33, 1, 0.66), cut_points=(Fraction(1, 3), Fraction(2, 3)),
+                         base="total")
@@ -0,0 +1,339 @@
+from math import log
+
+import numpy as np
+import pandas as pd
+
+
+class TradeLog:
+    """
+    Columnar log of all trades in the model. Every column is a typed NumPy array that is preallocated and doubled in
+    size when it is full, so appending a trade does not create a Python dict per row. The exported DataFrame and Arrow
+    table share memory with the columns.
+
+    The log has four levels. With "full" every trade is stored, with "off" nothing is stored. With "aggregate" only one
+    row per step is stored, with the total sugar, spice and units and the geometric mean price of the step (the trader
+    ids are -1). With "sample" a uniform reservoir sample of at most sample_size trades is stored per step.
+
+    Attributes:
+        mode (str): The logging level, either "off", "aggregate", "sample" or "full"
+        sample_size (int): Maximum number of trades stored per step with the "sample" level
+        rng (numpy.random.Generator): Random number generator used for the reservoir sample, separate from the one of
+            the model so sampling does not change the simulation
+        capacity (int): Number of rows allocated in every column
+        size (int): Number of rows in the log
+        step (numpy.ndarray): Step of every trade
+        high_id (numpy.ndarray): Unique id of the trader with the higher MRS
+        low_id (numpy.ndarray): Unique id of the trader with the lower MRS
+        sugar (numpy.ndarray): Sugar exchanged
+        spice (numpy.ndarray): Spice exchanged
+        price (numpy.ndarray): (Geometric mean) trade price
+        units (numpy.ndarray): Number of units the row summarizes
+
+    Methods:
+        append(step, high_id, low_id, sugar, spice, price, units)
+            Add a single trade to the log.
+        extend(step, high_id, low_id, sugar, spice, price, units)
+            Add many trades of the same step to the log at once.
+        end_step(step)
+            Store the aggregate or the sample of a step.
+        columns()
+            Get views of all columns, limited to the rows in the log.
+        to_dataframe()
+            Get the log as a DataFrame.
+        to_arrow()
+            Get the log as an Arrow table.
+        drain()
+            Get the log as a DataFrame and empty it.
+    """
+    # Data type and DataFrame column name of every column
+    COLUMNS = {
+        "step": (np.int32, "Step"),
+        "high_id": (np.int32, "TraderHighMRS_ID"),
+        "low_id": (np.int32, "TraderLowMRS_ID"),
+        "sugar": (np.float32, "TradeSugar"),
+        "spice": (np.float32, "TradeSpice"),
+        "price": (np.float32, "TradePrice"),
+        "units": (np.int32, "TradeUnits"),
+    }
+
+    # Logging levels from least to most detailed
+    MODES = ("off", "aggregate", "sample", "full")
+
+    def __init__(self, mode: str = "full", sample_size: int = 100, rng: np.random.Generator = None,
+                 capacity: int = 4096):
+        """
+        Constructor for TradeLog
+
+        Args:
+            mode (str): The logging level, either "off", "aggregate", "sample" or "full"
+            sample_size (int): Maximum number of trades stored per step with the "sample" level
+            rng (numpy.random.Generator): Random number generator used for the reservoir sample
+            capacity (int): Number of rows to allocate at the start, the columns grow when more are needed
+        """
+        if mode not in self.MODES:
+            raise ValueError("Invalid trade logging")
+        self.mode = mode
+        self.sample_size = sample_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        self.capacity = max(1, capacity)
+        self.size = 0
+        for name, (dtype, label) in self.COLUMNS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype))
+
+        # Totals of the current step for the "aggregate" level
+        self._totals = [0.0, 0.0, 0.0, 0]
+
+        # Reservoir of the current step for the "sample" level, with the order in which the trades arrived
+        self._seen = 0
+        self._reservoir = {name: np.zeros(sample_size, dtype=dtype) for name, (dtype, label) in self.COLUMNS.items()}
+        self._arrival = np.zeros(sample_size, dtype=np.int64)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Whether trades are logged at all.
+
+        Returns:
+            bool: False if the logging level is "off"
+        """
+        return self.mode != "off"
+
+    def __len__(self) -> int:
+        """
+        Number of rows in the log.
+
+        Returns:
+            int: Number of rows in the log
+        """
+        return self.size
+
+    def _reserve(self, n: int) -> None:
+        """
+        Make sure there is room for n more rows, doubling the capacity of all columns until there is.
+
+        Args:
+            n (int): Number of rows to add
+
+        Returns:
+            None
+        """
+        if self.size + n <= self.capacity:
+            return
+
+        while self.size + n > self.capacity:
+            self.capacity *= 2
+        for name in self.COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, step: int, high_id: int, low_id: int, sugar: float, spice: float, price: float,
+               units: int = 1) -> None:
+        """
+        Add a single trade to the log, or to the aggregate or the sample of the current step.
+
+        Args:
+            step (int): Step of the trade
+            high_id (int): Unique id of the trader with the higher MRS
+            low_id (int): Unique id of the trader with the lower MRS
+            sugar (float): Sugar exchanged
+            spice (float): Spice exchanged
+            price (float): (Geometric mean) trade price
+            units (int): Number of units the row summarizes
+
+        Returns:
+            None
+        """
+        if self.mode == "off":
+            return
+        if self.mode == "aggregate":
+            self._totals[0] += sugar
+            self._totals[1] += spice
+            self._totals[2] += log(price) * units
+            self._totals[3] += units
+            return
+
+        if self.mode == "sample":
+            # Place in the reservoir, or skip the trade
+            place = self._seen if self._seen < self.sample_size else int(self.rng.integers(0, self._seen + 1))
+            if place < self.sample_size:
+                for name, value in zip(self.COLUMNS, (step, high_id, low_id, sugar, spice, price, units)):
+                    self._reservoir[name][place] = value
+                self._arrival[place] = self._seen
+            self._seen += 1
+            return
+
+        self._reserve(1)
+        row = self.size
+        self.step[row] = step
+        self.high_id[row] = high_id
+        self.low_id[row] = low_id
+        self.sugar[row] = sugar
+        self.spice[row] = spice
+        self.price[row] = price
+        self.units[row] = units
+        self.size += 1
+
+    def extend(self, step: int, high_id: np.ndarray, low_id: np.ndarray, sugar: np.ndarray, spice: np.ndarray,
+               price: np.ndarray, units: np.ndarray) -> None:
+        """
+        Add many trades of the same step to the log at once, or to the aggregate or the sample of the current step.
+
+        Args:
+            step (int): Step of the trades
+            high_id (numpy.ndarray): Unique ids of the traders with the higher MRS
+            low_id (numpy.ndarray): Unique ids of the traders with the lower MRS
+            sugar (numpy.ndarray): Sugar exchanged
+            spice (numpy.ndarray): Spice exchanged
+            price (numpy.ndarray): (Geometric mean) trade prices
+            units (numpy.ndarray): Number of units every row summarizes
+
+        Returns:
+            None
+        """
+        n = len(high_id)
+        if self.mode == "off" or n == 0:
+            return
+        if self.mode == "aggregate":
+            self._totals[0] += float(np.sum(sugar))
+            self._totals[1] += float(np.sum(spice))
+            self._totals[2] += float(np.dot(np.log(price), units))
+            self._totals[3] += int(np.sum(units))
+            return
+        if self.mode == "sample":
+            self._sample(step, high_id, low_id, sugar, spice, price, units)
+            return
+
+        self._reserve(n)
+        rows = slice(self.size, self.size + n)
+        self.step[rows] = step
+        self.high_id[rows] = high_id
+        self.low_id[rows] = low_id
+        self.sugar[rows] = sugar
+        self.spice[rows] = spice
+        self.price[rows] = price
+        self.units[rows] = units
+        self.size += n
+
+    def _sample(self, step: int, high_id: np.ndarray, low_id: np.ndarray, sugar: np.ndarray, spice: np.ndarray,
+                price: np.ndarray, units: np.ndarray) -> None:
+        """
+        Add trades to the reservoir sample of the current step (Algorithm R). The first sample_size trades fill the
+        reservoir, after which the t-th trade replaces a random trade of the reservoir with probability sample_size / t.
+        The replacements of all new trades are drawn at once, and only the last trade assigned to a place is written,
+        so a later trade overwrites an earlier one just like when they are added one by one.
+
+        Args:
+            step (int): Step of the trades
+            high_id (numpy.ndarray): Unique ids of the traders with the higher MRS
+            low_id (numpy.ndarray): Unique ids of the traders with the lower MRS
+            sugar (numpy.ndarray): Sugar exchanged
+            spice (numpy.ndarray): Spice exchanged
+            price (numpy.ndarray): (Geometric mean) trade prices
+            units (numpy.ndarray): Number of units every row summarizes
+
+        Returns:
+            None
+        """
+        n = len(high_id)
+        arrival = np.arange(self._seen, self._seen + n)
+
+        # Place in the reservoir of every trade, trades that are not kept get a place outside of it
+        places = arrival.copy()
+        full = arrival >= self.sample_size
+        places[full] = self.rng.integers(0, arrival[full] + 1)
+        kept = np.flatnonzero(places < self.sample_size)
+
+        # Keep only the last trade assigned to every place, the order of duplicate writes is unspecified in NumPy
+        _, last = np.unique(places[kept][::-1], return_index=True)
+        kept = kept[len(kept) - 1 - last]
+
+        values = {"step": step, "high_id": high_id, "low_id": low_id, "sugar": sugar, "spice": spice, "price": price,
+                  "units": units}
+        for name, value in values.items():
+            self._reservoir[name][places[kept]] = np.broadcast_to(value, n)[kept]
+        self._arrival[places[kept]] = arrival[kept]
+        self._seen += n
+
+    def end_step(self, step: int) -> None:
+        """
+        Store the aggregate or the reservoir sample of a step, and start a new one. Does nothing for the "off" and
+        "full" levels.
+
+        Args:
+            step (int): The step that ended
+
+        Returns:
+            None
+        """
+        if self.mode == "aggregate":
+            sugar, spice, log_price, units = self._totals
+            if units > 0:
+                self._reserve(1)
+                row = self.size
+                self.step[row] = step
+                self.high_id[row] = self.low_id[row] = -1
+                self.sugar[row] = sugar
+                self.spice[row] = spice
+                self.price[row] = np.exp(log_price / units)
+                self.units[row] = units
+                self.size += 1
+            self._totals = [0.0, 0.0, 0.0, 0]
+
+        elif self.mode == "sample":
+            # Store the sample in the order the trades arrived
+            n = min(self._seen, self.sample_size)
+            order = np.argsort(self._arrival[:n])
+            self._reserve(n)
+            for name in self.COLUMNS:
+                getattr(self, name)[self.size:self.size + n] = self._reservoir[name][:n][order]
+            self.size += n
+            self._seen = 0
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Get views of all columns, limited to the rows in the log. The views are not copies, they stay valid until the
+        columns grow.
+
+        Returns:
+            dict[str, numpy.ndarray]: Views of the columns by DataFrame column name
+        """
+        return {label: getattr(self, name)[:self.size] for name, (dtype, label) in self.COLUMNS.items()}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Get the log as a DataFrame with the same columns as the former "Trades" table. The DataFrame is built on the
+        columns without copying them, so it should be copied before the model is stepped further if it is kept.
+
+        Returns:
+            pd.DataFrame: The trade log
+        """
+        return pd.DataFrame(self.columns(), copy=False)
+
+    def to_arrow(self):
+        """
+        Get the log as an Arrow table, without copying the columns. Requires pyarrow.
+
+        Returns:
+            pyarrow.Table: The trade log
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is required to export the trade log to Arrow")
+
+        return pa.table(self.columns())
+
+    def drain(self) -> pd.DataFrame:
+        """
+        Get the log as a DataFrame and empty it, so the log stays bounded when it is streamed to disk. The DataFrame
+        is a copy, and the allocated columns are reused for the next rows.
+
+        Returns:
+            pd.DataFrame: The rows logged since the last drain
+        """
+        frame = self.to_dataframe().copy()
+        self.size = 0
+        return frame
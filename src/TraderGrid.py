@@ -0,0 +1,130 @@
+import numpy as np
+from mesa.agent import Agent
+from mesa.space import MultiGrid
+
+
+class TraderGrid(MultiGrid):
+    """
+    MultiGrid that keeps track of the number of traders in every cell, so checking if a cell is taken does not require
+    going through the contents of the cell.
+
+    Attributes:
+        occupancy (numpy.ndarray): Number of traders in every cell, indexed by [x, y]
+        vision_tables (dict): Cached von Neumann offsets and squared distances for every vision radius
+
+    Methods:
+        place_agent(agent, pos)
+            Place an agent on the grid and mark its cell as occupied.
+        remove_agent(agent)
+            Remove an agent from the grid and release its cell.
+        move_agent(agent, pos)
+            Move an agent to another cell.
+        vision_offsets(radius)
+            Get the von Neumann offsets and squared distances for a vision radius.
+        visible_cells(pos, radius)
+            Get the coordinates and squared distances of all cells within a vision radius.
+    """
+    def __init__(self, width: int, height: int, torus: bool):
+        """
+        Constructor for TraderGrid
+
+        Args:
+            width (int): The width of the grid
+            height (int): The height of the grid
+            torus (bool): Whether the grid wraps around at the edges
+        """
+        super().__init__(width, height, torus)
+        self.occupancy = np.zeros((width, height), dtype=np.int32)
+        self.vision_tables = {}
+
+    def place_agent(self, agent: Agent, pos: tuple[int, int]) -> None:
+        """
+        Place an agent on the grid and mark its cell as occupied.
+
+        Args:
+            agent (Agent): The agent to place
+            pos (tuple[int, int]): The position to place the agent on
+
+        Returns:
+            None
+        """
+        super().place_agent(agent, pos)
+        self.occupancy[pos] += 1
+
+    def remove_agent(self, agent: Agent) -> None:
+        """
+        Remove an agent from the grid and release its cell.
+
+        Args:
+            agent (Agent): The agent to remove
+
+        Returns:
+            None
+        """
+        self.occupancy[agent.pos] -= 1
+        super().remove_agent(agent)
+
+    def move_agent(self, agent: Agent, pos: tuple[int, int]) -> None:
+        """
+        Move an agent to another cell, updating the occupancy of both cells.
+
+        Args:
+            agent (Agent): The agent to move
+            pos (tuple[int, int]): The position to move the agent to
+
+        Returns:
+            None
+        """
+        pos = self.torus_adj(pos)
+        self.remove_agent(agent)
+        self.place_agent(agent, pos)
+
+    def vision_offsets(self, radius: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Get the von Neumann offsets and squared distances for a vision radius. The offsets are ordered in the same way
+        as MultiGrid.get_neighborhood, so ties are broken in the same order. Tables are computed once per radius.
+
+        Args:
+            radius (int): The vision radius
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray]: The x and y offsets as an array of shape (n, 2), and the squared
+            distance of every offset
+        """
+        if radius not in self.vision_tables:
+            # All offsets within the radius, without the center
+            dx, dy = np.meshgrid(np.arange(-radius, radius + 1), np.arange(-radius, radius + 1), indexing="ij")
+            dx, dy = dx.ravel(), dy.ravel()
+            within = (np.abs(dx) + np.abs(dy) <= radius) & ((dx != 0) | (dy != 0))
+            offsets = np.column_stack((dx[within], dy[within]))
+
+            self.vision_tables[radius] = (offsets, (offsets ** 2).sum(axis=1))
+
+        return self.vision_tables[radius]
+
+    def visible_cells(self, pos: tuple[int, int], radius: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the coordinates and squared distances of all cells within a von Neumann vision radius of a position.
+        Cells outside the grid are clipped, or wrapped around if the grid is a torus.
+
+        Args:
+            pos (tuple[int, int]): The position to look from
+            radius (int): The vision radius
+
+        Returns:
+            tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: The x coordinates, y coordinates and squared
+            distances of the visible cells
+        """
+        offsets, distances = self.vision_offsets(radius)
+        x = offsets[:, 0] + pos[0]
+        y = offsets[:, 1] + pos[1]
+
+        if self.torus:
+            x %= self.width
+            y %= self.height
+            distances = (x - pos[0]) ** 2 + (y - pos[1]) ** 2
+        else:
+            inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+            x, y, distances = x[inside], y[inside], distances[inside]
+
+        return x, y, distances
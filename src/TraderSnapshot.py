@@ -0,0 +1,83 @@
+import numpy as np
+from mesa.model import Model
+
+
+class TraderSnapshot:
+    """
+    Columnar snapshot of all living traders at one step of the model. The columns are gathered in a single pass over
+    the traders (or read from the trader population with the "vectorized" engine), so the reporters of a step share
+    them instead of every reporter walking the traders again. Statistics derived from the snapshot by the reporters
+    can be stored in its cache.
+
+    Attributes:
+        step (int): The step of the model the snapshot was taken
+        size (int): Number of living traders
+        sugar (numpy.ndarray): Sugar of every trader
+        spice (numpy.ndarray): Spice of every trader
+        sugar_metabolism (numpy.ndarray): Sugar metabolism of every trader
+        spice_metabolism (numpy.ndarray): Spice metabolism of every trader
+        vision (numpy.ndarray): Vision of every trader
+        age (numpy.ndarray): Age of every trader
+        x (numpy.ndarray): x coordinate of every trader
+        y (numpy.ndarray): y coordinate of every trader
+        wealth (numpy.ndarray): Wealth of every trader, computed from the current sugar and spice
+        cache (dict): Statistics derived from the snapshot
+
+    Methods:
+        from_model(model)
+            Take a snapshot of the living traders of a model.
+    """
+    # Attributes gathered from every trader
+    COLUMNS = ("sugar", "spice", "sugar_metabolism", "spice_metabolism", "vision", "age", "x", "y")
+
+    def __init__(self, step: int, columns: dict[str, np.ndarray]):
+        """
+        Constructor for TraderSnapshot
+
+        Args:
+            step (int): The step of the model the snapshot was taken
+            columns (dict[str, numpy.ndarray]): The values of every attribute in COLUMNS for all living traders
+        """
+        self.step = step
+        for name in self.COLUMNS:
+            setattr(self, name, columns[name])
+        self.size = len(self.sugar)
+
+        # The wealth cached by the traders is from before trading, taxes and metabolism
+        self.wealth = self.sugar / self.sugar_metabolism + self.spice / self.spice_metabolism
+
+        self.cache = {}
+
+    def __len__(self) -> int:
+        """
+        Number of living traders.
+
+        Returns:
+            int: Number of living traders
+        """
+        return self.size
+
+    @classmethod
+    def from_model(cls, model: Model) -> "TraderSnapshot":
+        """
+        Take a snapshot of the living traders of a model. The "vectorized" engine reads the columns of the trader
+        population, while the "agent" engine gathers all attributes of every trader in one pass.
+
+        Args:
+            model (SugarScape): Model to take the snapshot of
+
+        Returns:
+            TraderSnapshot: The snapshot of the current step
+        """
+        if model.population is not None:
+            population = model.population
+            alive = population.alive[:population.size]
+            columns = {name: getattr(population, name)[:population.size][alive] for name in cls.COLUMNS}
+            return cls(model.current_step, columns)
+
+        # One row per trader, one column per attribute
+        rows = np.array([(trader.sugar, trader.spice, trader.sugar_metabolism, trader.spice_metabolism,
+                          trader.vision, trader.age, trader.pos[0], trader.pos[1])
+                         for trader in model.traders.values()], dtype=float).reshape(-1, len(cls.COLUMNS))
+        columns = {name: rows[:, i] for i, name in enumerate(cls.COLUMNS)}
+        return cls(model.current_step, columns)
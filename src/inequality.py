@@ -0,0 +1,108 @@
+from typing import Callable
+
+import numpy as np
+from mesa.model import Model
+
+# Inequality aversion of the Atkinson index
+ATKINSON_EPSILON = 0.5
+
+# Population shares at which the Lorenz curve is reported
+LORENZ_POINTS = np.linspace(0.1, 0.9, 9)
+
+
+def lorenz_curve(sorted_wealth: np.ndarray, points: np.ndarray = LORENZ_POINTS) -> np.ndarray:
+    """
+    Compute the Lorenz curve of a sorted array of wealth values, the share of the total wealth held by the poorest
+    fraction of the population, at the given population shares.
+
+    Args:
+        sorted_wealth (numpy.ndarray): Wealth of every trader, sorted from low to high
+        points (numpy.ndarray): Population shares between 0 and 1
+
+    Returns:
+        numpy.ndarray: Share of the total wealth held at every population share
+
+    """
+    n = len(sorted_wealth)
+    total_wealth = sorted_wealth.sum() if n > 0 else 0
+    if total_wealth == 0:
+        return np.zeros(len(points))
+
+    # Interpolate the cumulative wealth share between traders
+    cumulative_share = np.concatenate(([0], np.cumsum(sorted_wealth) / total_wealth))
+    return np.interp(np.asarray(points) * n, np.arange(n + 1), cumulative_share)
+
+
+def inequality_metrics(wealth: np.ndarray, epsilon: float = ATKINSON_EPSILON) -> dict[str, float]:
+    """
+    Compute the Gini coefficient, Theil index, Atkinson index, top 10% share, 33rd and 66th percentiles and the
+    Lorenz curve of an array of wealth values. The wealth is sorted once, and all metrics are vectorized reductions of
+    the sorted array.
+
+    Args:
+        wealth (numpy.ndarray): Wealth of every trader
+        epsilon (float): Inequality aversion of the Atkinson index
+
+    Returns:
+        dict[str, float]: The metrics by reporter name, all 0 if there is no wealth
+
+    """
+    names = ["Gini", "Theil", "Atkinson", "Top 10% Share", "P33", "P66"]
+    names += [f"Lorenz {point:.0%}" for point in LORENZ_POINTS]
+
+    n = len(wealth)
+    sorted_wealth = np.sort(wealth)
+    total_wealth = sorted_wealth.sum() if n > 0 else 0
+    if total_wealth == 0:
+        return dict.fromkeys(names, 0.0)
+
+    # Wealth relative to the mean, the Theil index counts 0 * log(0) as 0
+    relative = sorted_wealth * (n / total_wealth)
+    log_relative = np.log(relative, out=np.zeros(n), where=relative > 0)
+    theil = np.dot(relative, log_relative) / n
+
+    # Atkinson index, the geometric mean is used for an inequality aversion of 1
+    if epsilon == 1:
+        atkinson = 1 - np.exp(log_relative.mean()) if relative.min() > 0 else 1.0
+    else:
+        atkinson = 1 - np.mean(relative ** (1 - epsilon)) ** (1 / (1 - epsilon))
+
+    gini = (2 * np.dot(np.arange(1, n + 1), sorted_wealth)) / (n * total_wealth) - (n + 1) / n
+    lorenz = lorenz_curve(sorted_wealth)
+    top_share = 1 - lorenz_curve(sorted_wealth, np.array([0.9]))[0]
+
+    # Percentiles with linear interpolation between traders, like np.percentile
+    p33, p66 = np.interp(np.array([0.33, 0.66]) * (n - 1), np.arange(n), sorted_wealth)
+
+    values = [gini, theil, atkinson, top_share, p33, p66, *lorenz]
+    return {name: float(value) for name, value in zip(names, values)}
+
+
+def compute_inequality(model: Model) -> dict[str, float]:
+    """
+    Compute all inequality metrics of the wealth of the living traders for the current step. The result is cached in
+    the trader snapshot of the current step, so the inequality reporters share one sort.
+
+    Args:
+        model (Model): Model instance.
+
+    Returns:
+        dict[str, float]: The metrics by reporter name
+
+    """
+    snapshot = model.snapshot()
+    if "inequality" not in snapshot.cache:
+        snapshot.cache["inequality"] = inequality_metrics(snapshot.wealth)
+    return snapshot.cache["inequality"]
+
+
+def inequality_reporters() -> dict[str, Callable[[Model], float]]:
+    """
+    Get a model reporter for every inequality metric, each reading the cached result of compute_inequality.
+
+    Returns:
+        dict[str, Callable[[Model], float]]: The reporters by name
+
+    """
+    names = inequality_metrics(np.zeros(0)).keys()
+    return {name: (lambda model, name=name: compute_inequality(model)[name]) for name in names}
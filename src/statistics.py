@@ -1,10 +1,15 @@
 import numpy as np
 from mesa.model import Model
 
+# Number of traders above which the Gini coefficient is approximated in "auto" mode, and the number of bins used
+GINI_EXACT_LIMIT = 100_000
+GINI_BINS = 4096
+
 
 def compute_std_trade_price(model: Model) -> float:
     """
-    Compute the standard deviation of the log of trade prices for the current step.
+    Compute the standard deviation of the log of trade prices for the current step, over every unit traded. Read from
+    the running trade accumulators of the model, so the trade log is not needed.
 
     Args:
         model (Model): Model model instance.
@@ -13,20 +18,17 @@ def compute_std_trade_price(model: Model) -> float:
         float: Standard deviation of the log of trade prices for the current step
 
     """
-    trade_data = model.get_trade_log()
-    if len(trade_data) == 0:
-        return 0
-    current_step_trades = trade_data[trade_data["Step"] == model.current_step]
-    if len(current_step_trades) == 0:
+    if model.trade_count_step == 0:
         return 0
-    log_trade_prices = np.log(current_step_trades["TradePrice"])
-    std_log_price = np.std(log_trade_prices)
-    return std_log_price
+    average_price = model.trade_log_price_sum_step / model.trade_count_step
+    variance = model.trade_log_price_squares_step / model.trade_count_step - average_price ** 2
+    return np.sqrt(max(variance, 0))
 
 
 def compute_average_trade_price(model: Model) -> float:
     """
-    Compute the average of the log of trade prices for the current step.
+    Compute the average of the log of trade prices for the current step, over every unit traded. Read from the
+    running trade accumulators of the model, so the trade log is not needed.
 
     Args:
         model (Model): Model model instance.
@@ -35,20 +37,14 @@ def compute_average_trade_price(model: Model) -> float:
         float: Average of the log of trade prices for the current step
 
     """
-    trade_data = model.get_trade_log()
-    if len(trade_data) == 0:
-        return 0
-    current_step_trades = trade_data[trade_data["Step"] == model.current_step]
-    if len(current_step_trades) == 0:
+    if model.trade_count_step == 0:
         return 0
-    log_trade_prices = np.log(current_step_trades["TradePrice"])
-    average_price = np.mean(log_trade_prices)
-    return average_price
+    return model.trade_log_price_sum_step / model.trade_count_step
 
 
 def compute_trade_counts(model: Model) -> int:
     """
-    Compute the number of trades that occurred in the current step.
+    Compute the number of trades (units exchanged) that occurred in the current step.
 
     Args:
         model (Model): Model model instance.
@@ -57,14 +53,73 @@ def compute_trade_counts(model: Model) -> int:
         int: Number of trades that occurred in the current step
 
     """
-    trade_data = model.get_trade_log()
-    current_step_trades = trade_data[trade_data["Step"] == model.current_step]
-    return len(current_step_trades)
+    return model.trade_count_step
+
+
+def gini(wealth: np.ndarray) -> float:
+    """
+    Compute the Gini coefficient of an array of wealth values.
+
+    Args:
+        wealth (numpy.ndarray): Wealth of every trader
+
+    Returns:
+        float: Gini coefficient
+
+    """
+    n = len(wealth)
+    if n == 0:
+        return 0
+    sorted_wealths = np.sort(wealth)
+    total_wealth = sorted_wealths.sum()
+    if total_wealth == 0:
+        return 0
+    cumulative_sum = np.dot(np.arange(1, n + 1), sorted_wealths)
+    return float((2 * cumulative_sum) / (n * total_wealth) - (n + 1) / n)
+
+
+def gini_histogram(wealth: np.ndarray, bins: int = GINI_BINS) -> float:
+    """
+    Approximate the Gini coefficient of an array of wealth values with a fixed-bin histogram, without sorting. The
+    number of traders and their total wealth are counted per bin, and the Lorenz curve is integrated over the bins as
+    if all traders in a bin had the same wealth. This is exact when they do, and the error shrinks with the width of
+    the bins otherwise.
+
+    Args:
+        wealth (numpy.ndarray): Wealth of every trader
+        bins (int): Number of bins between the lowest and the highest wealth
+
+    Returns:
+        float: Approximate Gini coefficient
+
+    """
+    n = len(wealth)
+    if n == 0:
+        return 0
+    total_wealth = wealth.sum()
+    if total_wealth == 0:
+        return 0
+
+    # Count traders and wealth per bin
+    lowest, highest = wealth.min(), wealth.max()
+    if highest == lowest:
+        return 0
+    index = np.minimum(((wealth - lowest) * (bins / (highest - lowest))).astype(np.int64), bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    sums = np.bincount(index, weights=wealth, minlength=bins)
+
+    # Integrate the Lorenz curve with trapezoids per bin
+    lorenz = np.cumsum(sums) / total_wealth
+    previous = np.concatenate(([0], lorenz[:-1]))
+    return float(1 - np.dot(counts / n, previous + lorenz))
 
 
 def compute_gini(model: Model) -> float:
     """
-    Compute the Gini coefficient for the current step.
+    Compute the Gini coefficient for the current step. The wealth is read from the trader snapshot, which computes it
+    from the current sugar and spice of the traders, since the wealth cached by the traders is from before trading,
+    taxes and metabolism. Depending on the gini_mode of the model, the Gini coefficient is computed exactly,
+    approximated with a histogram, or approximated only when there are more than GINI_EXACT_LIMIT traders ("auto").
 
     Args:
         model (Model): Model model instance.
@@ -73,17 +128,12 @@ def compute_gini(model: Model) -> float:
         float: Gini coefficient for the current step
 
     """
-    agent_wealths = [agent.sugar / agent.sugar_metabolism + agent.spice / agent.spice_metabolism for agent in
-                     model.traders.values()]
-    sorted_wealths = sorted(agent_wealths)
-    n = len(sorted_wealths)
-    if n == 0:
-        return 0
-    cumulative_sum = sum((i + 1) * wealth for i, wealth in enumerate(sorted_wealths))
-    total_wealth = sum(sorted_wealths)
-    gini = (2 * cumulative_sum) / (n * total_wealth) - (n + 1) / n
+    wealth = model.snapshot().wealth
 
-    return gini
+    gini_mode = getattr(model, "gini_mode", "exact")
+    if gini_mode == "approximate" or (gini_mode == "auto" and len(wealth) > GINI_EXACT_LIMIT):
+        return gini_histogram(wealth)
+    return gini(wealth)
 
 
 def compute_deaths_by_age(model: Model) -> int:
@@ -152,10 +202,10 @@ def compute_average_vision(model: Model) -> float:
         float: Average vision of all living Trader agents
 
     """
-    traders = [agent for agent in model.traders.values()]
-    if len(traders) == 0:
+    visions = model.snapshot().vision
+    if len(visions) == 0:
         return 0
-    average_vision = sum(trader.vision for trader in traders) / len(traders)
+    average_vision = np.mean(visions)
     return average_vision
 
 
@@ -170,10 +220,10 @@ def compute_average_sugar_metabolism(model: Model) -> float:
         float: Average sugar metabolism of all living Trader
 
     """
-    traders = [agent for agent in model.traders.values()]
-    if len(traders) == 0:
+    sugar_metabolisms = model.snapshot().sugar_metabolism
+    if len(sugar_metabolisms) == 0:
         return 0
-    average_sugar_metabolism = sum(trader.sugar_metabolism for trader in traders) / len(traders)
+    average_sugar_metabolism = np.mean(sugar_metabolisms)
     return average_sugar_metabolism
 
 
@@ -188,13 +238,67 @@ def compute_average_spice_metabolism(model: Model) -> float:
         float: Average spice metabolism of all living Trader agents
 
     """
-    traders = [agent for agent in model.traders.values()]
-    if len(traders) == 0:
+    spice_metabolisms = model.snapshot().spice_metabolism
+    if len(spice_metabolisms) == 0:
         return 0
-    average_spice_metabolism = sum(trader.spice_metabolism for trader in traders) / len(traders)
+    average_spice_metabolism = np.mean(spice_metabolisms)
     return average_spice_metabolism
 
 
+def segregation_bands(model: Model) -> np.ndarray:
+    """
+    Get the y coordinates where the middle and the upper region of the grid start. Uses the segregation_bands of the
+    model if they are set, and otherwise scales the bands of a 50 high grid (middle from 23, upper from 28) with the
+    height of the grid.
+
+    Args:
+        model (Model): Model instance.
+
+    Returns:
+        numpy.ndarray: The first y coordinate of the middle and of the upper region
+
+    """
+    bands = getattr(model, "segregation_bands", None)
+    if bands is None:
+        height = model.grid.height
+        bands = (round(height * 23 / 50), round(height * 28 / 50))
+    return np.asarray(bands)
+
+
+def compute_segregation(model: Model) -> dict[str, float]:
+    """
+    Compute the average sugar metabolism, spice metabolism and vision of the living Trader agents in the lower,
+    middle and upper region of the grid in a single pass. Every trader gets a region label with np.digitize, and the
+    sums and counts per region are computed with np.bincount. The result is cached in the trader snapshot of the
+    current step, so the regional reporters share one pass.
+
+    Args:
+        model (Model): Model instance.
+
+    Returns:
+        dict[str, float]: The averages by reporter name, 0 for regions without traders
+
+    """
+    snapshot = model.snapshot()
+    if "segregation" in snapshot.cache:
+        return snapshot.cache["segregation"]
+
+    # Region of every trader
+    regions = np.digitize(snapshot.y, segregation_bands(model))
+    counts = np.bincount(regions, minlength=3)
+
+    result = {}
+    for attribute, label in (("spice_metabolism", "Spice Metabolism"), ("sugar_metabolism", "Sugar Metabolism"),
+                             ("vision", "Vision")):
+        sums = np.bincount(regions, weights=getattr(snapshot, attribute), minlength=3)
+        means = np.divide(sums, counts, out=np.zeros(3), where=counts > 0)
+        for region, mean in zip(("Lower", "Middle", "Upper"), means.tolist()):
+            result[f"{region} {label}"] = mean
+
+    snapshot.cache["segregation"] = result
+    return result
+
+
 def compute_lower_spice_metabolism(model: Model) -> float:
     """
     Compute the average spice metabolism of all living Trader agents in the lower region of the grid.
@@ -206,11 +310,7 @@ def compute_lower_spice_metabolism(model: Model) -> float:
         float: Average spice metabolism of all living Trader agents in the lower region of the grid
 
     """
-    spice_metabolisms = [agent.spice_metabolism for agent in model.traders.values() if
-                         agent.pos[1] < 23]
-    if len(spice_metabolisms) == 0:
-        return 0
-    return np.mean(spice_metabolisms)
+    return compute_segregation(model)["Lower Spice Metabolism"]
 
 
 def compute_lower_sugar_metabolism(model: Model) -> float:
@@ -224,11 +324,7 @@ def compute_lower_sugar_metabolism(model: Model) -> float:
         float: Average sugar metabolism of all living Trader agents in the lower region of the grid
 
     """
-    sugar_metabolisms = [agent.sugar_metabolism for agent in model.traders.values() if
-                         agent.pos[1] < 23]
-    if len(sugar_metabolisms) == 0:
-        return 0
-    return np.mean(sugar_metabolisms)
+    return compute_segregation(model)["Lower Sugar Metabolism"]
 
 
 def compute_middle_spice_metabolism(model: Model) -> float:
@@ -242,11 +338,7 @@ def compute_middle_spice_metabolism(model: Model) -> float:
         float: Average spice metabolism of all living Trader agents in the middle region of the grid
 
     """
-    spice_metabolisms = [agent.spice_metabolism for agent in model.traders.values() if
-                         23 <= agent.pos[1] <= 27]
-    if len(spice_metabolisms) == 0:
-        return 0
-    return np.mean(spice_metabolisms)
+    return compute_segregation(model)["Middle Spice Metabolism"]
 
 
 def compute_middle_sugar_metabolism(model: Model) -> float:
@@ -260,11 +352,7 @@ def compute_middle_sugar_metabolism(model: Model) -> float:
         float: Average sugar metabolism of all living Trader agents in the middle region of the grid
 
     """
-    sugar_metabolisms = [agent.sugar_metabolism for agent in model.traders.values() if
-                         23 <= agent.pos[1] <= 27]
-    if len(sugar_metabolisms) == 0:
-        return 0
-    return np.mean(sugar_metabolisms)
+    return compute_segregation(model)["Middle Sugar Metabolism"]
 
 
 def compute_upper_spice_metabolism(model: Model) -> float:
@@ -278,11 +366,7 @@ def compute_upper_spice_metabolism(model: Model) -> float:
         float: Average spice metabolism of all living Trader agents in the upper region of the grid
 
     """
-    spice_metabolisms = [agent.spice_metabolism for agent in model.traders.values() if
-                         agent.pos[1] > 27]
-    if len(spice_metabolisms) == 0:
-        return 0
-    return np.mean(spice_metabolisms)
+    return compute_segregation(model)["Upper Spice Metabolism"]
 
 
 def compute_upper_sugar_metabolism(model: Model) -> float:
@@ -296,11 +380,7 @@ def compute_upper_sugar_metabolism(model: Model) -> float:
         float: Average sugar metabolism of all living Trader agents in the upper region of the grid
 
     """
-    sugar_metabolisms = [agent.sugar_metabolism for agent in model.traders.values() if
-                         agent.pos[1] > 27]
-    if len(sugar_metabolisms) == 0:
-        return 0
-    return np.mean(sugar_metabolisms)
+    return compute_segregation(model)["Upper Sugar Metabolism"]
 
 
 def compute_lower_vision(model: Model) -> float:
@@ -314,11 +394,7 @@ def compute_lower_vision(model: Model) -> float:
         float: Average vision of all living Trader agents in the lower region of the grid
 
     """
-    visions = [agent.vision for agent in model.traders.values() if
-               agent.pos[1] < 23]
-    if len(visions) == 0:
-        return 0
-    return np.mean(visions)
+    return compute_segregation(model)["Lower Vision"]
 
 
 def compute_middle_vision(model: Model) -> float:
@@ -332,11 +408,7 @@ def compute_middle_vision(model: Model) -> float:
         float: Average vision of all living Trader agents in the middle region of the grid
 
     """
-    visions = [agent.vision for agent in model.traders.values() if
-               23 <= agent.pos[1] <= 27]
-    if len(visions) == 0:
-        return 0
-    return np.mean(visions)
+    return compute_segregation(model)["Middle Vision"]
 
 
 def compute_upper_vision(model: Model) -> float:
@@ -350,8 +422,4 @@ def compute_upper_vision(model: Model) -> float:
         float: Average vision of all living Trader agents in the upper region of the grid
 
     """
-    visions = [agent.vision for agent in model.traders.values() if
-               agent.pos[1] > 27]
-    if len(visions) == 0:
-        return 0
-    return np.mean(visions)
+    return compute_segregation(model)["Upper Vision"]
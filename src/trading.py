@@ -0,0 +1,320 @@
+import numpy as np
+from math import exp, log, sqrt
+
+
+def bilateral_trade(a_sugar: float, a_spice: float, a_sugar_metabolism: int, a_spice_metabolism: int,
+                    a_wealth: float, b_sugar: float, b_spice: float, b_sugar_metabolism: int,
+                    b_spice_metabolism: int, b_wealth: float, sugar_weight: float, spice_weight: float,
+                    per_unit: bool = False) -> tuple:
+    """
+    Resolve all trades between two traders. The traders keep exchanging one unit at a time at the geometric mean of
+    their Marginal Rates of Substitution (MRS), until the MRS are equal, one of them runs out of the traded good, or
+    a trade would not improve the welfare of both traders or would cross their welfare. The welfare is computed with
+    the weights of trader a, which is the trader that initiates the trade.
+
+    The exchange is done on plain floats, without method calls or attribute lookups, and the trades are summarized per
+    direction (which trader has the higher MRS) unless per_unit is set.
+
+    Args:
+        a_sugar (float): Sugar of trader a
+        a_spice (float): Spice of trader a
+        a_sugar_metabolism (int): Sugar metabolism of trader a
+        a_spice_metabolism (int): Spice metabolism of trader a
+        a_wealth (float): Wealth of trader a
+        b_sugar (float): Sugar of trader b
+        b_spice (float): Spice of trader b
+        b_sugar_metabolism (int): Sugar metabolism of trader b
+        b_spice_metabolism (int): Spice metabolism of trader b
+        b_wealth (float): Wealth of trader b
+        sugar_weight (float): Weight of sugar in the welfare of trader a
+        spice_weight (float): Weight of spice in the welfare of trader a
+        per_unit (bool): Return one record per unit exchanged instead of one record per direction
+
+    Returns:
+        tuple: The sugar and spice of trader a, the sugar and spice of trader b, a list of trade records and the
+        price statistics. Every record is a tuple (a_is_high, sugar, spice, price, units), where a_is_high tells if
+        trader a had the higher MRS, sugar and spice are the total amounts exchanged, price is the (geometric mean)
+        trade price and units is the number of exchanges. The price statistics are a tuple (units, log_price_sum,
+        log_price_squares) over every unit exchanged.
+    """
+    records = []
+    summary = {}
+    n_units = 0
+    log_price_sum = 0.0
+    log_price_squares = 0.0
+
+    while True:
+        # Compute MRS
+        a_mrs = (a_sugar_metabolism * a_spice) / (a_spice_metabolism * a_sugar + 1e-9)
+        b_mrs = (b_sugar_metabolism * b_spice) / (b_spice_metabolism * b_sugar + 1e-9)
+
+        # No more trading if MRS are equal
+        if a_mrs == b_mrs:
+            break
+
+        # Compute the trade price
+        price = sqrt(a_mrs * b_mrs)
+        if price == 0:
+            break
+
+        # Check if trade price is greater than 1
+        if price > 1:
+            trade_spice = price
+            trade_sugar = 1
+        else:
+            trade_spice = 1
+            trade_sugar = 1 / price
+
+        # Trader with the higher MRS buys sugar and sells spice
+        a_is_high = a_mrs > b_mrs
+        if a_is_high:
+            high_sugar, high_spice, high_wealth = a_sugar, a_spice, a_wealth
+            low_sugar, low_spice, low_wealth = b_sugar, b_spice, b_wealth
+        else:
+            high_sugar, high_spice, high_wealth = b_sugar, b_spice, b_wealth
+            low_sugar, low_spice, low_wealth = a_sugar, a_spice, a_wealth
+
+        # Update based on available goods
+        trade_sugar = min(trade_sugar, low_sugar)
+        trade_spice = min(trade_spice, high_spice)
+
+        # No more sugar/spice to trade
+        if trade_sugar <= 0 or trade_spice <= 0:
+            break
+
+        # Holdings after the trade
+        high_sugar += trade_sugar
+        high_spice -= trade_spice
+        low_sugar -= trade_sugar
+        low_spice += trade_spice
+
+        # Stop if welfare is not improved or MRS is crossed
+        high_welfare = high_sugar ** sugar_weight * high_spice ** spice_weight
+        low_welfare = low_sugar ** sugar_weight * low_spice ** spice_weight
+        if not (high_welfare > high_wealth and low_welfare > low_wealth and high_welfare > low_welfare):
+            break
+
+        # Trade sugar and spice
+        if a_is_high:
+            a_sugar, a_spice, b_sugar, b_spice = high_sugar, high_spice, low_sugar, low_spice
+        else:
+            a_sugar, a_spice, b_sugar, b_spice = low_sugar, low_spice, high_sugar, high_spice
+
+        # Price statistics
+        log_price = log(price)
+        n_units += 1
+        log_price_sum += log_price
+        log_price_squares += log_price * log_price
+
+        # Record trade
+        if per_unit:
+            records.append((a_is_high, trade_sugar, trade_spice, price, 1))
+        elif a_is_high in summary:
+            total = summary[a_is_high]
+            total[0] += trade_sugar
+            total[1] += trade_spice
+            total[2] += log_price
+            total[3] += 1
+        else:
+            summary[a_is_high] = [trade_sugar, trade_spice, log_price, 1, price]
+
+    # Summarize trades per direction
+    for a_is_high, (sugar, spice, log_price, units, first_price) in summary.items():
+        price = first_price if units == 1 else exp(log_price / units)
+        records.append((a_is_high, sugar, spice, price, units))
+
+    return a_sugar, a_spice, b_sugar, b_spice, records, (n_units, log_price_sum, log_price_squares)
+
+
+def adjacent_pairs(x: np.ndarray, y: np.ndarray, width: int, height: int,
+                   occupancy: np.ndarray = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Find all pairs of traders that are von Neumann neighbours (distance one) on a non-torus grid. Every unordered pair
+    is returned once. Traders in the same cell are not neighbours of each other, just like in MultiGrid.get_neighbors.
+
+    Args:
+        x (numpy.ndarray): x coordinate of every trader
+        y (numpy.ndarray): y coordinate of every trader
+        width (int): The width of the grid
+        height (int): The height of the grid
+        occupancy (numpy.ndarray): Number of traders in every cell, used to skip empty neighbouring cells
+
+    Returns:
+        tuple[numpy.ndarray, numpy.ndarray]: Indices of the first and second trader of every pair
+    """
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+
+    # Sort traders by cell
+    cell = x * height + y
+    order = np.argsort(cell, kind="stable")
+    sorted_cells = cell[order]
+
+    firsts = []
+    seconds = []
+    for dx, dy in ((1, 0), (0, 1)):
+        # Traders with a neighbouring cell on the right or on top
+        source = np.flatnonzero((x + dx < width) & (y + dy < height))
+        if occupancy is not None:
+            source = source[occupancy[x[source] + dx, y[source] + dy] > 0]
+
+        # All traders in the neighbouring cell
+        target = cell[source] + dx * height + dy
+        start = np.searchsorted(sorted_cells, target, side="left")
+        counts = np.searchsorted(sorted_cells, target, side="right") - start
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        firsts.append(np.repeat(source, counts))
+        seconds.append(order[np.repeat(start, counts) + offsets])
+
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def matching_rounds(first: np.ndarray, second: np.ndarray, n_traders: int) -> np.ndarray:
+    """
+    Assign every pair to a round such that no trader appears twice in the same round, and pairs that share a trader
+    keep their order. Executing the rounds one after the other is therefore equivalent to executing the pairs in order.
+
+    Args:
+        first (numpy.ndarray): Index of the first trader of every pair
+        second (numpy.ndarray): Index of the second trader of every pair
+        n_traders (int): Total number of traders
+
+    Returns:
+        numpy.ndarray: Round of every pair
+    """
+    next_round = [0] * n_traders
+    rounds = []
+    for i, j in zip(first.tolist(), second.tolist()):
+        current = max(next_round[i], next_round[j])
+        rounds.append(current)
+        next_round[i] = next_round[j] = current + 1
+
+    return np.array(rounds, dtype=np.int64)
+
+
+def batched_trade(first: np.ndarray, second: np.ndarray, sugar: np.ndarray, spice: np.ndarray,
+                  sugar_metabolism: np.ndarray, spice_metabolism: np.ndarray, wealth: np.ndarray,
+                  sugar_weight: np.ndarray, spice_weight: np.ndarray, per_unit: bool = False) -> tuple:
+    """
+    Resolve the trades of many pairs at once, in the given order. The pairs are split into rounds in which no trader
+    appears twice, and all pairs of a round exchange units in lockstep with array operations. Every pair follows the
+    same rules as bilateral_trade, with the first trader of the pair as the initiator.
+
+    Args:
+        first (numpy.ndarray): Index of the first trader (initiator) of every pair
+        second (numpy.ndarray): Index of the second trader of every pair
+        sugar (numpy.ndarray): Sugar of every trader, updated in place
+        spice (numpy.ndarray): Spice of every trader, updated in place
+        sugar_metabolism (numpy.ndarray): Sugar metabolism of every trader
+        spice_metabolism (numpy.ndarray): Spice metabolism of every trader
+        wealth (numpy.ndarray): Wealth of every trader
+        sugar_weight (numpy.ndarray): Weight of sugar in the welfare of every trader
+        spice_weight (numpy.ndarray): Weight of spice in the welfare of every trader
+        per_unit (bool): Return one record per unit exchanged instead of one record per pair and direction
+
+    Returns:
+        tuple: Arrays describing the trade records, ordered by pair: the pair index, whether the first trader had the
+        higher MRS, the sugar and spice exchanged, the (geometric mean) trade price and the number of units, followed
+        by the price statistics (units, log_price_sum, log_price_squares) over every unit exchanged
+    """
+    n_pairs = len(first)
+    rounds = matching_rounds(first, second, len(sugar))
+
+    # Records per unit, or totals per pair and direction (0: second trader is high, 1: first trader is high)
+    unit_records = []
+    stats = [0, 0.0, 0.0]
+    totals = np.zeros((n_pairs, 2, 4))
+    first_price = np.zeros((n_pairs, 2))
+
+    for current in range(rounds.max() + 1 if n_pairs else 0):
+        pairs = np.flatnonzero(rounds == current)
+        a, b = first[pairs], second[pairs]
+
+        # Weights of the initiator
+        weight_sugar, weight_spice = sugar_weight[a], spice_weight[a]
+
+        while len(pairs):
+            a_sugar, a_spice, b_sugar, b_spice = sugar[a], spice[a], sugar[b], spice[b]
+
+            # Compute MRS and trade price
+            a_mrs = (sugar_metabolism[a] * a_spice) / (spice_metabolism[a] * a_sugar + 1e-9)
+            b_mrs = (sugar_metabolism[b] * b_spice) / (spice_metabolism[b] * b_sugar + 1e-9)
+            price = np.sqrt(a_mrs * b_mrs)
+            with np.errstate(divide="ignore"):
+                trade_sugar = np.where(price > 1, 1, 1 / price)
+            trade_spice = np.where(price > 1, price, 1)
+
+            # Trader with the higher MRS buys sugar and sells spice
+            a_is_high = a_mrs > b_mrs
+            high_sugar = np.where(a_is_high, a_sugar, b_sugar)
+            high_spice = np.where(a_is_high, a_spice, b_spice)
+            low_sugar = np.where(a_is_high, b_sugar, a_sugar)
+            low_spice = np.where(a_is_high, b_spice, a_spice)
+
+            # Update based on available goods
+            trade_sugar = np.minimum(trade_sugar, low_sugar)
+            trade_spice = np.minimum(trade_spice, high_spice)
+
+            # Holdings after the trade
+            high_sugar = high_sugar + trade_sugar
+            high_spice = high_spice - trade_spice
+            low_sugar = low_sugar - trade_sugar
+            low_spice = low_spice + trade_spice
+
+            # Welfare after the trade
+            with np.errstate(invalid="ignore"):
+                high_welfare = high_sugar ** weight_sugar * high_spice ** weight_spice
+                low_welfare = low_sugar ** weight_sugar * low_spice ** weight_spice
+
+            # Pairs that keep trading
+            trading = ((a_mrs != b_mrs) & (price != 0) & (trade_sugar > 0) & (trade_spice > 0)
+                       & (high_welfare > np.where(a_is_high, wealth[a], wealth[b]))
+                       & (low_welfare > np.where(a_is_high, wealth[b], wealth[a]))
+                       & (high_welfare > low_welfare))
+
+            # Trade sugar and spice
+            a_is_high, pairs, a, b = a_is_high[trading], pairs[trading], a[trading], b[trading]
+            high_sugar, high_spice = high_sugar[trading], high_spice[trading]
+            low_sugar, low_spice = low_sugar[trading], low_spice[trading]
+            sugar[a] = np.where(a_is_high, high_sugar, low_sugar)
+            spice[a] = np.where(a_is_high, high_spice, low_spice)
+            sugar[b] = np.where(a_is_high, low_sugar, high_sugar)
+            spice[b] = np.where(a_is_high, low_spice, high_spice)
+
+            # Record trades
+            trade_sugar, trade_spice, price = trade_sugar[trading], trade_spice[trading], price[trading]
+            log_price = np.log(price)
+            stats[0] += len(pairs)
+            stats[1] += float(log_price.sum())
+            stats[2] += float(np.dot(log_price, log_price))
+            if per_unit:
+                unit_records.append((pairs, a_is_high, trade_sugar, trade_spice, price))
+            else:
+                direction = a_is_high.astype(np.int64)
+                new = totals[pairs, direction, 3] == 0
+                first_price[pairs[new], direction[new]] = price[new]
+                totals[pairs, direction] += np.column_stack((trade_sugar, trade_spice, log_price,
+                                                             np.ones(len(pairs))))
+
+            weight_sugar, weight_spice = weight_sugar[trading], weight_spice[trading]
+
+    if per_unit:
+        if not unit_records:
+            empty = np.zeros(0)
+            return (empty.astype(np.int64), empty.astype(bool), empty, empty, empty, empty.astype(np.int64),
+                    tuple(stats))
+
+        # Order units by pair, keeping the order in which they were exchanged
+        pairs, a_is_high, trade_sugar, trade_spice, price = (np.concatenate(column) for column in zip(*unit_records))
+        order = np.argsort(pairs, kind="stable")
+        return (pairs[order], a_is_high[order], trade_sugar[order], trade_spice[order], price[order],
+                np.ones(len(order), dtype=np.int64), tuple(stats))
+
+    # Summarize trades per pair and direction
+    pairs, direction = np.nonzero(totals[:, :, 3])
+    units = totals[pairs, direction, 3].astype(np.int64)
+    price = np.where(units == 1, first_price[pairs, direction], np.exp(totals[pairs, direction, 2] / units))
+
+    return (pairs, direction.astype(bool), totals[pairs, direction, 0], totals[pairs, direction, 1], price, units,
+            tuple(stats))